@@ -0,0 +1,206 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Benchmarks of the aldsim model entry points
+
+Usage:
+
+    python benchmarks/bench.py record results.json
+    python benchmarks/bench.py record results.json -k WellMixed
+    python benchmarks/bench.py compare baseline.json results.json --threshold 0.2
+
+record times the startup of a fresh interpreter importing aldsim, and
+calc_coverage, run and saturation_curve of every model
+for small, large and extreme Damkohler numbers, as well as the
+throughput of the vectorized evaluation against batch size and number
+of worker processes, and stores the results as JSON. compare flags the
+benchmarks whose time increased by more than the threshold with respect
+to a baseline, and exits with a non-zero status if any is found.
+
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from aldsim import Precursor, ALDideal, aldmodel
+from aldsim.core.ideal.particle.batch import PlugFlowMixed, WellMixed
+from aldsim.core.ideal.particle.continuous import PlugFlowSpatial, WellMixedSpatial
+from aldsim.core.softsat.batch import WellStirred as SoftWellStirred
+from aldsim.core.softsat.batch import PlugFlowMixed as SoftPlugFlowMixed
+from aldsim.sweeps import evaluate
+
+
+Da_values = {'small': 1e-2, 'large': 1e2, 'extreme': 1e4}
+
+ideal_models = [PlugFlowMixed, WellMixed, PlugFlowSpatial, WellMixedSpatial]
+softsat_models = [SoftWellStirred, SoftPlugFlowMixed]
+dose_models = ['zeroD', 'wellstirred', 'fluidizedbed']
+
+
+def timer(f):
+    """Best time per call of f, in seconds"""
+    t = timeit.Timer(f)
+    n, _ = t.autorange()
+    return min(t.repeat(repeat=3, number=n))/n
+
+
+def model_cases():
+    """Yields name, callable pairs for every model entry point"""
+    for cls in ideal_models:
+        for label, Da in Da_values.items():
+            name = '%s.%%s[%s]' % (cls.__name__, label)
+            m = cls(Da)
+            yield name % 'calc_coverage', lambda m=m: m.calc_coverage(t=1)
+            yield name % 'run', m.run
+            yield name % 'saturation_curve', m.saturation_curve
+    for cls in softsat_models:
+        for label, Da in Da_values.items():
+            name = 'softsat.%s.%%s[%s]' % (cls.__name__, label)
+            def make(cls=cls, Da=Da):
+                return cls(Da, 0.01*Da, 0.5, 0.5)
+            yield name % 'calc_coverage', lambda make=make: make().calc_coverage(1)
+            yield name % 'run', lambda make=make: make().run()
+            yield name % 'saturation_curve', lambda make=make: make().saturation_curve()
+    for model_name in dose_models:
+        for label, Da in Da_values.items():
+            chem = ALDideal(Precursor(mass=150.0), 1e19, 1e-3, dm=1.0)
+            m = aldmodel(chem, model_name, p=0.1*1e5/760, p0=1e2, T=500,
+                S=1e1, flow=60)
+            if hasattr(m, 'Da'):
+                chem.beta0 = 1e-3*Da/m.Da()
+                name = 'dose.%s.%%s[%s]' % (model_name, label)
+            else:
+                # Models without a Damkohler number are benchmarked once
+                name = 'dose.%s.%%s' % model_name
+            yield name % 'calc_coverage', lambda m=m: m.calc_coverage(m.t0())
+            for method in ('run', 'saturation_curve'):
+                if hasattr(m, method):
+                    yield name % method, getattr(m, method)
+            if not hasattr(m, 'Da'):
+                break
+
+
+import_cases = {
+    'import.python': 'pass',
+    'import.aldsim': 'import aldsim',
+    'import.aldsim+vth': 'import aldsim; aldsim.Precursor(mass=150.0).vth(500)',
+    'import.aldsim+ode': 'from aldsim.core.ideal.particle.batch import WellMixed; '
+        'WellMixed(10, method="ode").run()',
+}
+
+
+def import_time(code, repeat=7):
+    """Best wall time of a fresh interpreter running code, in seconds"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def _evaluate_chunk(args):
+    model_cls, t, Da = args
+    return evaluate(model_cls, t, Da=Da)[0]
+
+
+def scaling_cases(batch_sizes, workers):
+    """Yields name, callable, batch size triples for the throughput benchmarks"""
+    t = np.linspace(0, 5, 101)
+    for cls in ideal_models:
+        for n in batch_sizes:
+            Da = np.logspace(-2, 4, n)
+            yield '%s.evaluate[n=%d]' % (cls.__name__, n), \
+                lambda cls=cls, Da=Da: evaluate(cls, t, Da=Da), n
+    for n in batch_sizes:
+        params = dict(D1=np.logspace(-2, 4, n), a=0.01, f1=0.5)
+        yield 'softsat.WellStirred.evaluate[n=%d]' % n, \
+            lambda params=params: evaluate(SoftWellStirred, t, **params), n
+    n = max(batch_sizes)
+    Da = np.logspace(-2, 4, n)
+    for w in workers:
+        chunks = [(WellMixed, t, c) for c in np.array_split(Da, w)]
+        def f(chunks=chunks, w=w):
+            with ProcessPoolExecutor(w) as ex:
+                return list(ex.map(_evaluate_chunk, chunks))
+        yield 'WellMixed.evaluate[n=%d,workers=%d]' % (n, w), f, n
+
+
+def record(args):
+    results = {}
+    for name, code in import_cases.items():
+        if args.k not in name:
+            continue
+        results[name] = {'time': import_time(code)}
+        print('%-60s %12.3e s' % (name, results[name]['time']))
+    for name, f in model_cases():
+        if args.k not in name:
+            continue
+        results[name] = {'time': timer(f)}
+        print('%-60s %12.3e s' % (name, results[name]['time']))
+    for name, f, n in scaling_cases(args.batch_sizes, args.workers):
+        if args.k not in name:
+            continue
+        tm = timer(f)
+        results[name] = {'time': tm, 'throughput': n/tm}
+        print('%-60s %12.3e s %12.3e /s' % (name, tm, n/tm))
+    meta = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+    with open(args.output, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=1)
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        base = json.load(f)['results']
+    with open(args.current) as f:
+        current = json.load(f)['results']
+    regressions = []
+    for name in sorted(set(base) & set(current)):
+        ratio = current[name]['time']/base[name]['time']
+        flag = ''
+        if ratio > 1 + args.threshold:
+            flag = 'REGRESSION'
+            regressions.append(name)
+        elif ratio < 1/(1 + args.threshold):
+            flag = 'improved'
+        print('%-60s %8.2fx %s' % (name, ratio, flag))
+    for name in sorted(set(current) - set(base)):
+        print('%-60s %9s' % (name, 'new'))
+    print('%d regressions beyond %.0f%%' % (len(regressions), 100*args.threshold))
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('record', help='run the benchmarks and store the results')
+    p.add_argument('output')
+    p.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000, 10000])
+    p.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    p.add_argument('-k', default='', help='only run benchmarks whose name contains K')
+    p = sub.add_parser('compare', help='compare results against a baseline')
+    p.add_argument('baseline')
+    p.add_argument('current')
+    p.add_argument('--threshold', type=float, default=0.2,
+        help='relative slowdown flagged as a regression')
+    args = parser.parse_args(argv)
+    if args.command == 'record':
+        return record(args)
+    return compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
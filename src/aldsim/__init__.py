@@ -1,2 +1,23 @@
 from .chem import ALDideal, Precursor
+# aldmodel only imports the model classes on first use. It is bound
+# here, rather than lazily, so that importing the aldsim.aldmodel
+# submodule cannot replace the function with the module.
 from .aldmodel import aldmodel
+
+__all__ = ['ALDideal', 'Precursor', 'aldmodel', 'sweep']
+
+_lazy = {
+    'sweep' : 'aldsim.sweeps',
+}
+
+def __getattr__(name):
+    """Imports the model entry points on first access (PEP 562)"""
+    if name in _lazy:
+        import importlib
+        value = getattr(importlib.import_module(_lazy[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy))
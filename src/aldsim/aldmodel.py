@@ -1,15 +1,23 @@
 #Copyright © 2024, UChicago Argonne, LLC
 
+import importlib
+
 from .chem import ALDideal
-from .models.dose import ZeroD, WellStirred, ParticlePlugFlow
 
 _ideal_models = {
-    'zeroD' : ZeroD,
-    'wellstirred' : WellStirred,
-    'fluidizedbed' : ParticlePlugFlow
+    'zeroD' : ('aldsim.models.dose', 'ZeroD'),
+    'wellstirred' : ('aldsim.models.dose', 'WellStirred'),
+    'fluidizedbed' : ('aldsim.models.dose', 'ParticlePlugFlow')
 }
 
+def _resolve(registry, model_name):
+    """Imports the model class the first time it is requested"""
+    entry = registry[model_name]
+    if isinstance(entry, tuple):
+        module, name = entry
+        entry = registry[model_name] = getattr(importlib.import_module(module), name)
+    return entry
+
 def aldmodel(process, model_name, **kwargs):
     if isinstance(process, ALDideal):
-        return _ideal_models[model_name](process, **kwargs)
-
+        return _resolve(_ideal_models, model_name)(process, **kwargs)
@@ -1,6 +1,6 @@
 #Copyright © 2024-2025, UChicago Argonne, LLC
 
-import math as m
+import numpy as np
 
 from .constants import amu, kb, Nav
 
@@ -11,12 +11,15 @@ def calc_vth(M, T):
     Parameters
     ----------
 
-    M : float
+    M : float or ndarray
         Molecular mass in atomic mass units
-    T : Temperature in K
+    T : float or ndarray
+        Temperature in K
+
+    Arrays are broadcast against each other.
 
     """
-    return m.sqrt(8*kb*T/(m.pi*amu*M))
+    return np.sqrt(8*kb*T/(np.pi*amu*M))
 
 
 def calc_sitearea_fromgpc(gpc, M, density, nmol=1):
@@ -27,18 +30,18 @@ def calc_sitearea_fromgpc(gpc, M, density, nmol=1):
     Parameters
     ----------
 
-    gpc : float
+    gpc : float or ndarray
         Growth per cycle, in Angstroms
-    M : float
+    M : float or ndarray
         Molecular mass from the solid in atomic mass units
-    density : float
+    density : float or ndarray
         Density of the film, in g/cm3
     nmol : int, optional (default 1)
         Number of precursor molecules per unit formula of the solid
 
     Returns
     -------
-    float
+    float or ndarray
         Average area of a surface site in sq. meters
 
     """
@@ -56,16 +59,16 @@ def calc_sitearea_fromqcm(mpc, M, nmol=1):
     Parameters
     ----------
 
-    mpc : float
+    mpc : float or ndarray
         Mass per cycle in  ng/cm2
-    M : float
+    M : float or ndarray
         Molecular mass in atomic mass units
     nmol : int, optional (default 1)
         Number of precursor molecules per unit formula of the solid
 
     Returns
     -------
-    float
+    float or ndarray
         Average area of a surface site in sq. meters
 
     """
@@ -80,14 +83,14 @@ def calc_sitearea_fromrbs(atoms_area, atoms_permol=1.0):
     Parameters
     ----------
 
-    atoms_area : float
+    atoms_area : float or ndarray
         Atoms per unit area for one ALD cycle (atoms per sq. meter)
     atoms_permol : int, optional (default 1)
         Number of atoms per precursor molecule
 
     Returns
     -------
-    float
+    float or ndarray
         Average area of a surface site in sq. meters
 
     """
@@ -24,11 +24,20 @@ class Precursor:
         self.ligands = ligands
 
     def vth(self, T):
-        """Calculate the mean thermal velocity at temperature T (in K)"""
+        """Calculate the mean thermal velocity at temperature T (in K)
+
+        T can be an array, and the mass of the precursor an array
+        broadcastable against it.
+
+        """
         return calc_vth(self.mass, T)
     
     def Jwall(self, T, p, in_mols=False):
-        """Calculate the flux per unit area for a given temperature (in K) and pressure (in Pa)"""
+        """Calculate the flux per unit area for a given temperature (in K) and pressure (in Pa)
+
+        T and p can be arrays, which are broadcast against each other.
+
+        """
         if in_mols:
             return 0.25*self.vth(T)*p/(Rgas*T)
         else:
@@ -77,7 +86,7 @@ class SurfaceKinetics:
     @property
     def f(self):
         """Fraction of reactive sites"""
-        self._f 
+        return self._f
 
     @f.setter
     def f(self, value):
@@ -128,12 +137,32 @@ class ALDideal(SurfaceKinetics):
             scale -= 1
         factor = int(10**(logtscale-scale))+1
         tmax= factor*10**scale
-        print(t0, tmax)
         dt = tmax/100
         x = np.arange(0, tmax, dt)
         y = 1-np.exp(-x/t0)
         return x, y
 
+    def saturation_surface(self, T, p, t, normalized=False):
+        """Coverage for a grid of temperatures, pressures and times
+
+        Args:
+            T (float or ndarray) : temperature in K
+            p (float or ndarray) : precursor pressure in Pa
+            t (ndarray) : 1D array of times
+            normalized (bool, optional) : if True, times are given in
+                units of the characteristic time t0 of each (T, p) point
+
+        Returns:
+            An array of coverages with shape broadcast(T, p) + t.shape
+
+        """
+        t = np.asarray(t, dtype=float)
+        if normalized:
+            x = np.broadcast_to(t, np.broadcast(T, p).shape + t.shape)
+        else:
+            x = t/np.asarray(self.t0(T, p))[...,None]
+        return 1-np.exp(-x)
+
 
 class ALDsoft(SurfaceKinetics):
     """First-order irreversible Langmuir kinetics with two reaction pathways"""
@@ -157,10 +186,9 @@ class ALDsoft(SurfaceKinetics):
         return self.f1*self.beta1*av1 + self.f2*self.beta2*av2
 
     def t0(self, T, p):
-        """Characteristic time for saturation"""
-        t1 = 1.0/(self.site_area*self.Jwall(T, p)*self.beta1)
-        t2 = 1.0/(self.site_area*self.Jwall(T, p)*self.beta2)
-        return t1, t2
+        """Characteristic times for saturation of the two pathways"""
+        rate = self.site_area*self.Jwall(T, p)
+        return 1.0/(rate*self.beta1), 1.0/(rate*self.beta2)
     
     def saturation_curve(self, T, p):
         """Return the saturation curve as a (time, coverage) tuple """
@@ -173,12 +201,35 @@ class ALDsoft(SurfaceKinetics):
             scale -= 1
         factor = int(10**(logtscale-scale))+1
         tmax= factor*10**scale
-        print(t0, tmax)
         dt = tmax/100
         x = np.arange(0, tmax, dt)
         y = (self.f1*(1-np.exp(-x/t1)) + self.f2*(1-np.exp(-x/t2)))/(self.f1+self.f2)
         return x, y
 
+    def saturation_surface(self, T, p, t, normalized=False):
+        """Coverage for a grid of temperatures, pressures and times
+
+        Args:
+            T (float or ndarray) : temperature in K
+            p (float or ndarray) : precursor pressure in Pa
+            t (ndarray) : 1D array of times
+            normalized (bool, optional) : if True, times are given in
+                units of the longest characteristic time of each (T, p)
+                point
+
+        Returns:
+            An array of coverages with shape broadcast(T, p) + t.shape
+
+        """
+        t = np.asarray(t, dtype=float)
+        t1, t2 = self.t0(T, p)
+        t1 = np.asarray(t1)[...,None]
+        t2 = np.asarray(t2)[...,None]
+        if normalized:
+            t = t*np.maximum(t1, t2)
+        y = self.f1*(1-np.exp(-t/t1)) + self.f2*(1-np.exp(-t/t2))
+        return y/(self.f1+self.f2)
+
 
 
 class ALDProcess:
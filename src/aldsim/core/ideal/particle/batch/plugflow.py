@@ -1,6 +1,8 @@
 #Copyright © 2024, UChicago Argonne, LLC
 
 import numpy as np
+from aldsim.sampling import sample_curve
+from aldsim.result import SimulationResult
 
 class PlugFlowMixed:
     """Model for batch particle coating under plug flow approximations.
@@ -41,8 +43,26 @@ class PlugFlowMixed:
         else:
             Da = self.Da
         return calc_coverage(Da, t)
+
+    def time_to_coverage(self, theta, Da=None):
+        """Calculates the dose time required to reach a given coverage
+
+        Args:
+            theta (float or ndarray): the target surface coverage
+            Da (float or ndarray, optional): the Damkohler number. If
+                provided, it overrides the current value.
+
+        Returns:
+            A tuple of normalized dose time, precursor utilization
+
+        """
+        if Da is not None:
+            self.Da = Da
+        else:
+            Da = self.Da
+        return calc_time(Da, theta), np.exp(-Da*(1-np.asarray(theta)))
     
-    def saturation_curve(self, tmax=5, dt= 0.01):
+    def saturation_curve(self, tmax=5, dt= 0.01, tol=None):
         """Calculates the saturation curve of the ALD process
 
         Calculates the saturation using either a default or
@@ -51,17 +71,19 @@ class PlugFlowMixed:
         Args:
             tmax (float, optional): largest normalized dose time.
             dt (float, optional): time step value.
+            tol (float, optional): if provided, the times are sampled
+                adaptively in [0, tmax] so that linear interpolation
+                between them is accurate within tol, and dt is ignored.
         
         Returns:
             A tuple of time, surface coverage arrays
         
         """
-        t = np.arange(0, tmax, dt)
         Da = self.Da
-        c = calc_coverage(Da, t)
+        t, c = sample_curve(lambda t: calc_coverage(Da, t), tmax, dt, tol)
         return t, c
     
-    def run(self, tmax=5, dt=0.01):
+    def run(self, tmax=5, dt=0.01, tol=None, dtype=None):
         """Runs the simulation for a given or predefined amount of time
 
         Runs the model for a predefined or user-provided time
@@ -69,19 +91,58 @@ class PlugFlowMixed:
         Args:
             tmax (float, optional): largest normalized dose time.
             dt (float, optional): time step value.
+            tol (float, optional): if provided, the times are sampled
+                adaptively in [0, tmax] so that linear interpolation
+                between them is accurate within tol, and dt is ignored.
+            dtype (optional): data type of the stored curves, such as
+                float32 to halve their memory.
         
         Returns:
-            A tuple of time, surface coverage, precursor utilization arrays
+            A SimulationResult with time, surface coverage and precursor
+            utilization, which unpacks as a tuple
         
         """
-        t = np.arange(0, tmax, dt)
+        t, y = sample_curve(lambda t: self._curves(t, dtype), tmax, dt, tol)
+        return SimulationResult(t, ('coverage', 'precursor'), y)
+
+    def _curves(self, t, dtype=None):
         Da = self.Da
-        y = 1/Da*np.log(1+(np.exp(Da)-1)*np.exp(-Da*t))
-        c = 1-y
-        x = np.exp(-Da*y)
-        return t, c, x
+        y = calc_unreacted(Da, t)
+        out = np.empty((2,) + np.shape(y), dtype=dtype)
+        np.subtract(1, y, out=out[0])
+        np.exp(-Da*y, out=out[1])
+        return out
 
 
 def calc_coverage(Da, t):
     """Analytical expression of the surface coverage for the PlugFlowMixed model"""
-    return 1 - 1/Da*np.log(1+(np.exp(Da)-1)*np.exp(-Da*t))
\ No newline at end of file
+    return 1 - calc_unreacted(Da, t)
+
+
+def calc_precursor(Da, t):
+    """Analytical expression of the precursor fraction for the PlugFlowMixed model"""
+    return np.exp(-Da*calc_unreacted(Da, t))
+
+
+def calc_time(Da, theta):
+    """Normalized dose time to reach a surface coverage theta for the PlugFlowMixed model"""
+    Da = np.asarray(Da, dtype=float)
+    y = 1-np.asarray(theta, dtype=float)
+    with np.errstate(divide='ignore'):
+        return ((_logexpm1(Da) - _logexpm1(Da*y))/Da)[()]
+
+
+def _logexpm1(v):
+    """Evaluates log(exp(v)-1) for v >= 0 without overflowing"""
+    return v + np.log(-np.expm1(-v))
+
+
+def calc_unreacted(Da, t):
+    """Fraction of unreacted sites for the PlugFlowMixed model
+
+    Evaluates 1/Da*log(1+(exp(Da)-1)*exp(-Da*t)) in a way that does
+    not overflow for large values of Da.
+
+    """
+    Da = np.asarray(Da, dtype=float)
+    return (np.logaddexp(0, Da + np.log(-np.expm1(-Da)) - Da*np.asarray(t))/Da)[()]
\ No newline at end of file
@@ -1,7 +1,10 @@
 #Copyright © 2024, UChicago Argonne, LLC
 
 import numpy as np
-from aldsim.solvers import ode_solver, boundedNewton_solver
+from aldsim.solvers import ode_solver, bracketedNewton_solver, SolutionCache
+from aldsim.sampling import sample_curve
+from aldsim.result import SimulationResult
+from aldsim.instrument import labelled
 
 class WellMixed:
     """Model for batch particle coating under a well mixed reactor approximation.
@@ -14,13 +17,22 @@ class WellMixed:
     with the sticking probability value contained in the Damkohler
     number.
 
+    By default the model is evaluated using its explicit solution in
+    terms of the Lambert W function. The original ODE integration is
+    available setting method to 'ode'.
+
     Args:
         Da (float) : Damkohler number
+        method (str, optional) : either 'analytic' (default) or 'ode'
 
     """
-    def __init__(self, Da=None):
+    cache = SolutionCache()
+
+    def __init__(self, Da=None, method='analytic'):
         self.Da = Da
+        self.method = method
 
+    @labelled
     def calc_coverage(self, Da=None, t=1):
         """Calculates the surface coverage
 
@@ -41,6 +53,26 @@ class WellMixed:
         else:
             self.Da = Da
         return calc_coverage(Da, t)
+
+    @labelled
+    def time_to_coverage(self, theta, Da=None):
+        """Calculates the dose time required to reach a given coverage
+
+        Args:
+            theta (float or ndarray): the target surface coverage
+            Da (float or ndarray, optional): the Damkohler number. If
+                provided, it overrides the current value.
+
+        Returns:
+            A tuple of normalized dose time, precursor utilization
+
+        """
+        if Da is None:
+            Da = self.Da
+        else:
+            self.Da = Da
+        theta = np.asarray(theta, dtype=float)
+        return calc_time(Da, theta), 1/(1+Da*(1-theta))
     
     def _f_t(self, theta, Da, tau):
         return theta - np.log(1-theta)/Da - tau
@@ -51,7 +83,11 @@ class WellMixed:
     def _f(self, t, y):
         return -y/(1/self.Da+y)
 
-    def run(self, tmax=5, dt=0.01):
+    def _solution(self, tmax):
+        return self.cache.get((float(self.Da),), tmax, lambda tmax:
+            ode_solver(self._f, [1], tmax, None, dense_output=True).sol)
+
+    def run(self, tmax=5, dt=0.01, tol=None, dtype=None):
         """Runs the simulation for a given or predefined amount of time
 
         Runs the model for a predefined or user-provided time
@@ -59,17 +95,33 @@ class WellMixed:
         Args:
             tmax (float, optional): largest normalized dose time.
             dt (float, optional): time step value.
+            tol (float, optional): if provided, the times are sampled
+                adaptively in [0, tmax] so that linear interpolation
+                between them is accurate within tol, and dt is ignored.
+            dtype (optional): data type of the stored curves, such as
+                float32 to halve their memory.
         
         Returns:
-            A tuple of time, surface coverage, precursor utilization arrays
+            A SimulationResult with time, surface coverage and precursor
+            utilization, which unpacks as a tuple
         
         """
-        out = ode_solver(self._f, [1], tmax, t_eval=np.arange(0,tmax,dt))
-        cov = 1-out.y[0,:]
-        x = 1/(1+self.Da*out.y[0,:])
-        return out.t, cov, x
+        if self.method not in ('analytic', 'ode'):
+            raise ValueError("Unknown method %s" % self.method)
+        t, y = sample_curve(lambda t: self._curves(tmax, t, dtype), tmax, dt, tol)
+        return SimulationResult(t, ('coverage', 'precursor'), y)
+
+    def _curves(self, tmax, t, dtype=None):
+        if self.method == 'analytic':
+            y = calc_unreacted(self.Da, t)
+        else:
+            y = self._solution(tmax)(t)[0]
+        out = np.empty((2,) + np.shape(y), dtype=dtype)
+        np.subtract(1, y, out=out[0])
+        np.divide(1, 1+self.Da*y, out=out[1])
+        return out
 
-    def saturation_curve(self, tmax=5, dt=0.01):
+    def saturation_curve(self, tmax=5, dt=0.01, tol=None):
         """Calculates the saturation curve of the ALD process
 
         Calculates the saturation using either a default or
@@ -78,45 +130,109 @@ class WellMixed:
         Args:
             tmax (float, optional): largest normalized dose time.
             dt (float, optional): time step value.
+            tol (float, optional): if provided, the times are sampled
+                adaptively in [0, tmax] so that linear interpolation
+                between them is accurate within tol, and dt is ignored.
         
         Returns:
             A tuple of time, surface coverage arrays
         
         """
-        t, cov, _ = self.run(tmax, dt)
+        t, cov, _ = self.run(tmax, dt, tol)
         return t, cov
         
-    def saturation_curve_implicit(self, theta_max=0.9999):
+    def saturation_curve_implicit(self, theta_max=0.9999, tol=None):
         Da = self.Da
-        theta = np.arange(0,theta_max,0.0001)
-        tau = theta - np.log(1-theta)/Da
+        theta, tau = sample_curve(lambda theta: calc_time(Da, theta),
+            theta_max, 0.0001, tol)
         return tau, theta
 
-    def fraction_out(self, theta_max=0.999):
+    def fraction_out(self, theta_max=0.999, tol=None):
         Da = self.Da
-        theta = np.arange(0,theta_max,0.0001)
-        tau = theta - np.log(1-theta)/Da
-        return tau, 1/(1+Da*(1-theta))
+        theta, (tau, x) = sample_curve(lambda theta: np.array([calc_time(Da, theta),
+            1/(1+Da*(1-theta))]), theta_max, 0.0001, tol)
+        return tau, x
 
 
 def calc_coverage(Da, tau):
+    """Surface coverage for the WellMixed model
+
+    Solves the implicit expression of the coverage for the WellMixed
+    model. Da and tau can be scalars or arrays, and are broadcast
+    against each other.
+
+    The equation is solved for z = -log(1-theta), which is bracketed
+    between 0 and Da*tau.
+
+    """
+    Da = np.asarray(Da, dtype=float)
+    tau = np.asarray(tau, dtype=float)
+    z0 = np.maximum(Da*(tau-1), -np.log1p(-0.5*np.minimum(Da*tau/(1+Da), 1)))
+    z = bracketedNewton_solver(_f_z, _fp_z, 0, Da*tau, x0=np.minimum(z0, Da*tau),
+        args=(Da, tau))
+    return -np.expm1(-z)
+
+
+def calc_time(Da, theta):
+    """Normalized dose time to reach a surface coverage theta for the WellMixed model"""
+    theta = np.asarray(theta, dtype=float)
+    with np.errstate(divide='ignore'):
+        return (theta - np.log1p(-theta)/Da)[()]
+
+
+def calc_precursor(Da, tau):
+    """Fraction of precursor leaving the reactor for the WellMixed model"""
+    return 1/(1+Da*calc_unreacted(Da, tau))
+
+
+def calc_unreacted(Da, tau):
+    """Fraction of unreacted sites for the WellMixed model
+
+    Explicit solution of the WellMixed model, y = W(Da*exp(Da*(1-tau)))/Da,
+    where W is the principal branch of the Lambert W function. Da and tau
+    can be scalars or arrays, and are broadcast against each other.
+
+    """
+    Da = np.asarray(Da, dtype=float)
+    tau = np.asarray(tau, dtype=float)
+    return (_lambertw_exp(np.log(Da) + Da*(1-tau))/Da)[()]
+
+
+def _lambertw_exp(z):
+    """Evaluates W(exp(z)) without overflowing for large z"""
+    from scipy.special import lambertw
+    z = np.asarray(z, dtype=float)
+    w = np.array(lambertw(np.exp(np.minimum(z, 700))).real)
+    large = z > 700
+    if np.any(large):
+        zl = z[large]
+        wl = zl - np.log(zl)
+        for _ in range(4):
+            wl = wl - (wl + np.log(wl) - zl)/(1 + 1/wl)
+        w[large] = wl
+    return w
+
+
+def _f_z(z, Da, tau):
+    return z/Da - np.expm1(-z) - tau
+
 
-    f = lambda t: t - np.log(1-t)/Da - tau
-    fdot = lambda t: 1 + 1/(Da*(1-t))
-    t = boundedNewton_solver(f, fdot)
-    return t
+def _fp_z(z, Da, tau):
+    return 1/Da + np.exp(-z)
 
 
-def saturation_curve_double(Da1, Da2, f1, f2, theta_max=0.99999):
+def saturation_curve_double(Da1, Da2, f1, f2, theta_max=0.99999, tol=None):
     alpha = Da2/Da1
-    theta2 = np.arange(0,theta_max,0.00001)
-    x2 = 1-theta2
-    x1 = np.power(x2, 1/alpha)
-    theta1 = 1-x1
-    tau = -np.log(x1)/Da1 + f1*theta1 + f2*(1-np.power(x1, alpha))
-    return tau, f1*theta1+f2*theta2
+    def curve(theta2):
+        x2 = 1-theta2
+        x1 = np.power(x2, 1/alpha)
+        theta1 = 1-x1
+        tau = -np.log(x1)/Da1 + f1*theta1 + f2*(1-np.power(x1, alpha))
+        return np.array([tau, f1*theta1+f2*theta2])
+    _, (tau, cov) = sample_curve(curve, theta_max, 0.00001, tol)
+    return tau, cov
 
 
-def saturation_curve(Da, tmax=5, dt= 0.01):
+def saturation_curve(Da, tmax=5, dt= 0.01, tol=None):
     m = WellMixed(Da)
-    return m.saturation_curve(tmax, dt)
+    return m.saturation_curve(tmax, dt, tol)
@@ -1,2 +1,4 @@
 from .plugflow import PlugFlowSpatial
 from .wellmixed import WellMixedSpatial
+from .zones import Zone, Purge, ZonePipeline
+from .rtd import TanksInSeries, AxialDispersion, Sampled
@@ -1,6 +1,10 @@
 #Copyright © 2024, UChicago Argonne, LLC
 
 import numpy as np
+from aldsim.solvers import bracketedNewton_solver
+from aldsim.sampling import sample_curve
+from aldsim.result import SimulationResult
+from aldsim.instrument import labelled
 
 class PlugFlowSpatial:
     """Plug flow model for particle coating using spatial ALD
@@ -26,7 +30,8 @@ class PlugFlowSpatial:
     def __init__(self, Da):
         self.Da = Da
 
-    def calc_coverage(self, Da=None, t=1):
+    @labelled
+    def calc_coverage(self, Da=None, t=1, rtd=None):
         """Calculates the surface coverage
 
         Calculates the surface coverage for a given normalized
@@ -36,6 +41,9 @@ class PlugFlowSpatial:
             t (float, optional): the normalized dose time
             Da (float, optional): the Damkohler number. If provided,
                 it overrides the current value.
+            rtd (RTD, optional): residence time distribution. If
+                provided, t is the mean residence time and the outlet
+                coverage is averaged over the distribution.
         
         Returns:
             Surface coverage
@@ -45,9 +53,31 @@ class PlugFlowSpatial:
             Da = self.Da
         else:
             self.Da = Da
+        if rtd is not None:
+            return rtd.average(calc_coverage, Da, t)
         return calc_coverage(Da, t)
+
+    @labelled
+    def time_to_coverage(self, theta, Da=None):
+        """Calculates the residence time required to reach a given coverage
+
+        Args:
+            theta (float or ndarray): the target surface coverage
+            Da (float or ndarray, optional): the Damkohler number. If
+                provided, it overrides the current value.
+
+        Returns:
+            A tuple of normalized residence time, precursor utilization
+
+        """
+        if Da is None:
+            Da = self.Da
+        else:
+            self.Da = Da
+        t = calc_time(Da, theta)
+        return t, calc_precursor(Da, t)
    
-    def run(self, tmax=5, dt=0.01):
+    def run(self, tmax=5, dt=0.01, tol=None, dtype=None):
         """Runs the simulation for a
 
         Runs the model for a range of residence time values
@@ -55,17 +85,21 @@ class PlugFlowSpatial:
         Args:
             tmax (float, optional): largest normalized residence time.
             dt (float, optional): time step value.
+            tol (float, optional): if provided, the times are sampled
+                adaptively in [0, tmax] so that linear interpolation
+                between them is accurate within tol, and dt is ignored.
+            dtype (optional): data type of the stored curves, such as
+                float32 to halve their memory.
         
         Returns:
-            A tuple of residence time, surface coverage, precursor utilization arrays
+            A SimulationResult with residence time, surface coverage and
+            precursor utilization, which unpacks as a tuple
         
         """
-        t = np.arange(0, tmax, dt)
-        c = np.array([calc_coverage(self.Da, ti) for ti in t])
-        prec = np.array([calc_precursor(self.Da, ti) for ti in t])
-        return t, c, prec
+        t, y = sample_curve(lambda t: self._curves(t, dtype), tmax, dt, tol)
+        return SimulationResult(t, ('coverage', 'precursor'), y)
     
-    def saturation_curve(self, tmax=5, dt=0.01):
+    def saturation_curve(self, tmax=5, dt=0.01, tol=None):
         """Calculates the saturation curve of the ALD process
 
         Calculates the saturation curve using either a default or
@@ -74,32 +108,91 @@ class PlugFlowSpatial:
         Args:
             tmax (float, optional): largest normalized residence time.
             dt (float, optional): time step value.
+            tol (float, optional): if provided, the times are sampled
+                adaptively in [0, tmax] so that linear interpolation
+                between them is accurate within tol, and dt is ignored.
         
         Returns:
             A tuple of residence time, surface coverage arrays
         
         """
-        t = np.arange(0, tmax, dt)
-        c = np.array([calc_coverage(self.Da, ti) for ti in t])
+        Da = self.Da
+        t, c = sample_curve(lambda t: calc_coverage(Da, t), tmax, dt, tol)
         return t, c
 
+    def _curves(self, t, dtype=None):
+        cov = calc_coverage(self.Da, t)
+        out = np.empty((2,) + np.shape(cov), dtype=dtype)
+        out[0] = cov
+        out[1] = calc_precursor(self.Da, t)
+        return out
 
 def calc_coverage(Da, t):
-    if t == 1:
-        return Da/(1+Da)
-    else:
-        x = np.exp(-Da*(1-t))
-        return 1-(1-t)/(1-t*x)
-    
+    """Analytical expression of the surface coverage for the PlugFlowSpatial model
+
+    Da and t can be scalars or arrays, and are broadcast against each other.
+    The expression is written in terms of u = Da*(1-t) so that the removable
+    singularity at t=1 is evaluated through a series expansion.
+
+    """
+    u = np.asarray(Da, dtype=float)*(1-np.asarray(t, dtype=float))
+    with np.errstate(over='ignore'):
+        g = Da*_exprel(-u) + np.exp(-u)
+    return (1-1/g)[()]
+
+
 def calc_precursor(Da, t):
-    if t == 1:
-        return 1-Da/(1+Da)
-    else:
-        x = np.exp(-Da*(1-t))
-        return (1-t)*x/(1-t*x)
+    """Analytical expression of the precursor fraction for the PlugFlowSpatial model
+
+    Da and t can be scalars or arrays, and are broadcast against each other.
+
+    """
+    u = np.asarray(Da, dtype=float)*(1-np.asarray(t, dtype=float))
+    with np.errstate(over='ignore'):
+        return (1/(1+Da*_exprel(u)))[()]
+
+
+def calc_time(Da, theta):
+    """Normalized residence time to reach a surface coverage theta for the PlugFlowSpatial model
+
+    The coverage is inverted with a bracketed Newton solver. For t > 1,
+    the coverage is larger than 1-exp(-Da*(t-1)), which provides the
+    upper end of the bracket.
+
+    """
+    Da = np.asarray(Da, dtype=float)
+    theta = np.asarray(theta, dtype=float)
+    with np.errstate(divide='ignore'):
+        tmax = 1 + np.maximum(-np.log1p(-theta), 0)/Da
+    return bracketedNewton_solver(_f_t, _fp_t, 0, tmax, x0=np.minimum(theta, tmax),
+        args=(Da, theta))
+
+
+def _f_t(t, Da, theta):
+    return calc_coverage(Da, t) - theta
+
+
+def _fp_t(t, Da, theta):
+    u = Da*(1-t)
+    g = Da*_exprel(-u) + np.exp(-u)
+    return Da*(Da*_exprel_prime(-u) + np.exp(-u))/g**2
+
+
+def _exprel(u):
+    """Evaluates (exp(u)-1)/u, using a series expansion close to u=0"""
+    small = np.abs(u) < 1e-4
+    us = np.where(small, 1.0, u)
+    return np.where(small, 1+u/2+u*u/6, np.expm1(us)/us)
+
+
+def _exprel_prime(u):
+    """Derivative of (exp(u)-1)/u, using a series expansion close to u=0"""
+    small = np.abs(u) < 1e-4
+    us = np.where(small, 1.0, u)
+    return np.where(small, 0.5+u/3+u*u/8, (us*np.exp(us)-np.expm1(us))/us**2)
 
 
-def saturation_curve(Da, tmax=5, dt= 0.01):
+def saturation_curve(Da, tmax=5, dt= 0.01, tol=None):
     m = PlugFlowSpatial(Da)
-    return m.saturation_curve(tmax, dt)
+    return m.saturation_curve(tmax, dt, tol)
 
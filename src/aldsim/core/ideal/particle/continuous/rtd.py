@@ -0,0 +1,158 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Residence time distributions of continuous particle reactors
+
+Particles leaving a continuous reactor have a distribution of residence
+times. Assuming segregated flow, the outlet coverage is the average of
+the coverage curve of the single-zone models over the residence time
+distribution (RTD):
+
+    theta_out = integral of E(t) theta(Da, t) dt
+
+The distributions are normalized to unit mean. Parametric distributions
+are integrated with Gauss-Legendre quadrature in the logarithm of the
+residence time, using two panels split at the normalized residence time
+t = 1, where the coverage curves change abruptly for large Damkohler
+numbers. The coverage at all the nodes is evaluated in a single
+broadcast call.
+
+"""
+
+import math
+
+import numpy as np
+
+
+class RTD:
+    """Base class for residence time distributions"""
+
+    def average(self, f, Da, t):
+        """Averages f(Da, t) over the residence times
+
+        Args:
+            f (callable): coverage function of the Damkohler number and
+                the normalized residence time
+            Da (float or ndarray): Damkohler number
+            t (float or ndarray): mean normalized residence time
+
+        Returns:
+            The average with shape broadcast(Da, t)
+
+        """
+        Da = np.asarray(Da, dtype=float)[...,None]
+        t = np.asarray(t, dtype=float)[...,None]
+        s, w = self._nodes(t)
+        return np.sum(w*f(Da, t*s), axis=-1)[()]
+
+
+class _ParametricRTD(RTD):
+    """Distribution with a closed-form density
+
+    Subclasses provide _logpdf(v), the logarithm of the density of
+    v = log(s) up to a constant, and the interval (lo, hi) of v
+    outside which the density is negligible.
+
+    """
+
+    def __init__(self, n):
+        x, w = np.polynomial.legendre.leggauss(n//2)
+        self._x = 0.5*(x+1)
+        self._w = 0.5*w
+
+    def nodes(self):
+        """Residence times relative to the mean and weights of the quadrature nodes"""
+        return self._nodes(np.float64(1))
+
+    def _nodes(self, t):
+        """Nodes with a panel boundary at s = 1/t"""
+        k = np.clip(-np.log(t), self.lo, self.hi)
+        v = np.concatenate([self.lo + (k-self.lo)*self._x,
+            k + (self.hi-k)*self._x], axis=-1)
+        w = np.concatenate([(k-self.lo)*self._w, (self.hi-k)*self._w], axis=-1)
+        logp = self._logpdf(v)
+        w = w*np.exp(logp - np.max(logp, axis=-1, keepdims=True))
+        return np.exp(v), w/np.sum(w, axis=-1, keepdims=True)
+
+
+class TanksInSeries(_ParametricRTD):
+    """Residence time distribution of N stirred tanks in series
+
+    The distribution is a gamma distribution of shape N, which needs
+    not be an integer.
+
+    Args:
+        N (float) : number of tanks
+        n (int, optional) : number of quadrature nodes
+
+    """
+
+    def __init__(self, N, n=128):
+        super().__init__(n)
+        self.N = N
+        # the density of v = log(s) is proportional to exp(N*(v-exp(v))).
+        # The bounds are the points where it drops by a factor exp(-40),
+        # found by Newton iterations from outside.
+        c = 40/N
+        lo, hi = -(1+c+math.sqrt(2*c)), c+math.sqrt(2*c)
+        for _ in range(100):
+            lo -= (math.exp(lo)-1-lo-c)/(math.exp(lo)-1)
+            hi -= (math.exp(hi)-1-hi-c)/(math.exp(hi)-1)
+        self.lo, self.hi = lo, hi
+
+    def _logpdf(self, v):
+        return self.N*(v - np.exp(v))
+
+
+class AxialDispersion(_ParametricRTD):
+    """Residence time distribution of the axial dispersion model
+
+    Uses the open-open boundary conditions, for which the distribution
+    is known in closed form, rescaled to unit mean.
+
+    Args:
+        Pe (float) : Peclet number
+        n (int, optional) : number of quadrature nodes
+
+    """
+
+    def __init__(self, Pe, n=128):
+        super().__init__(n)
+        self.Pe = Pe
+        self._mean = 1 + 2/Pe
+        # bounds where Pe*(1-theta)**2/(4*theta) = 40. Their product is one.
+        q = 160/Pe
+        h = math.log(0.5*(2+q+math.sqrt(q*(4+q))))
+        self.lo = -h - math.log(self._mean)
+        self.hi = h - math.log(self._mean)
+
+    def _logpdf(self, v):
+        theta = self._mean*np.exp(v)
+        return 0.5*np.log(theta) - self.Pe*(1-theta)**2/(4*theta)
+
+
+class Sampled(RTD):
+    """Measured residence time distribution
+
+    The distribution is integrated with the trapezoidal rule and rescaled
+    to unit mean, so that the mean residence time is set when averaging.
+
+    Args:
+        t (ndarray) : increasing sampling times, in any units
+        E (ndarray) : values of the distribution, not necessarily normalized
+
+    """
+
+    def __init__(self, t, E):
+        t = np.asarray(t, dtype=float)
+        dt = np.diff(t)
+        w = np.asarray(E, dtype=float)*0.5*(np.r_[dt, 0] + np.r_[0, dt])
+        w = w/np.sum(w)
+        self.s = t/np.sum(w*t)
+        self.w = w
+
+    def nodes(self):
+        """Residence times relative to the mean and weights of the quadrature nodes"""
+        return self.s, self.w
+
+    def _nodes(self, t):
+        return self.s, self.w
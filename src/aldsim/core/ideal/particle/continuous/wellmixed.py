@@ -1,6 +1,7 @@
 #Copyright © 2024, UChicago Argonne, LLC
 
 from ..batch.wellmixed import WellMixed, calc_coverage
+from aldsim.instrument import labelled
 
 class WellMixedSpatial(WellMixed):
     """Model for continuous particle coating under well stirred approximations.
@@ -27,7 +28,34 @@ class WellMixedSpatial(WellMixed):
 
     """
 
-def saturation_curve(Da, tmax=5, dt= 0.01):
+    @labelled
+    def calc_coverage(self, Da=None, t=1, rtd=None):
+        """Calculates the surface coverage
+
+        Calculates the surface coverage for a given normalized
+        residence time and Damkohler number.
+
+        Args:
+            t (float, optional): the normalized residence time
+            Da (float, optional): the Damkohler number. If provided,
+                it overrides the current value.
+            rtd (RTD, optional): residence time distribution. If
+                provided, t is the mean residence time and the outlet
+                coverage is averaged over the distribution.
+
+        Returns:
+            Surface coverage
+
+        """
+        if rtd is None:
+            return super().calc_coverage(Da, t)
+        if Da is None:
+            Da = self.Da
+        else:
+            self.Da = Da
+        return rtd.average(calc_coverage, Da, t)
+
+def saturation_curve(Da, tmax=5, dt= 0.01, tol=None):
     m = WellMixedSpatial(Da)
-    return m.saturation_curve(tmax, dt)
+    return m.saturation_curve(tmax, dt, tol)
 
@@ -0,0 +1,171 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Sequential zones of spatial ALD reactors for particles
+
+Particles moving through a spatial ALD line traverse a sequence of
+precursor and purge zones. Each precursor zone is described by one of
+the single-zone continuous models, and reacts with the fraction of
+sites available to its precursor at the inlet: sites terminated by the
+second precursor are available to the first one, and vice versa.
+
+A zone whose inlet has a fraction av of available sites is equivalent
+to a zone with a fully available surface, Damkohler number Da*av and
+normalized residence time t/av.
+
+All the zone parameters and the inlet state are broadcast against each
+other, so that many lines and operating points are evaluated at once.
+
+"""
+
+import numpy as np
+
+from .plugflow import PlugFlowSpatial
+from .plugflow import calc_coverage as _pfs_coverage
+from .plugflow import calc_precursor as _pfs_precursor
+from .wellmixed import WellMixedSpatial
+from ..batch.wellmixed import calc_coverage as _wm_coverage
+from ..batch.wellmixed import calc_precursor as _wm_precursor
+
+
+class Zone:
+    """Precursor zone
+
+    Args:
+        model_cls : PlugFlowSpatial or WellMixedSpatial
+        Da (float or ndarray) : Damkohler number of the zone
+        t (float or ndarray) : normalized residence time in the zone
+        precursor (int, optional) : 1 for the first precursor, which
+            reacts with the available sites, or 2 for the second one,
+            which reacts with the sites terminated by the first one.
+
+    """
+
+    def __init__(self, model_cls, Da, t, precursor=1):
+        try:
+            self._coverage, self._precursor = _zone_models[model_cls]
+        except KeyError:
+            raise ValueError("No zone model for %s" % model_cls.__name__)
+        if precursor not in (1, 2):
+            raise ValueError("precursor must be 1 or 2")
+        self.model_cls = model_cls
+        self.Da = Da
+        self.t = t
+        self.precursor = precursor
+
+    def react(self, av):
+        """Fraction of sites reacting and fraction of precursor leaving the zone
+
+        Args:
+            av (ndarray) : fraction of sites available to this
+                zone's precursor at the inlet
+
+        """
+        avs = np.where(av > 0, av, 1)
+        Da = self.Da*avs
+        t = self.t/avs
+        reacted = np.where(av > 0, av*self._coverage(Da, t), 0)
+        x = np.where(av > 0, self._precursor(Da, t), 1)
+        return reacted, x
+
+
+class Purge:
+    """Purge zone, in which no reaction takes place"""
+
+    precursor = None
+
+    def react(self, av):
+        return np.zeros_like(av), np.full_like(av, np.nan)
+
+
+class PipelineResult:
+    """State of the particles along a sequence of zones
+
+    Arrays have the zone index as their first axis, followed by the
+    broadcast shape of the zone parameters and the inlet state.
+
+    Args:
+        av (ndarray) : fraction of sites available to the first
+            precursor at the inlet and after each zone
+        reacted (ndarray) : fraction of sites reacting in each zone
+        precursor (ndarray) : fraction of precursor leaving each zone
+            unreacted. It is NaN for purge zones.
+        first (ndarray) : mask of the zones of the first precursor
+
+    """
+
+    def __init__(self, av, reacted, precursor, first):
+        self.av = av
+        self.reacted = reacted
+        self.precursor = precursor
+        self.first = first
+
+    @property
+    def coverage(self):
+        """Fraction of sites terminated by the first precursor"""
+        return 1-self.av
+
+    @property
+    def growth(self):
+        """Total growth, as a fraction of the saturated growth per cycle"""
+        mask = self.first.reshape((-1,) + (1,)*(self.reacted.ndim-1))
+        return np.sum(np.where(mask, self.reacted, 0), axis=0)
+
+
+class ZonePipeline:
+    """Sequence of precursor and purge zones
+
+    Args:
+        zones (list) : Zone and Purge objects, in the order in which
+            the particles traverse them
+
+    """
+
+    def __init__(self, zones):
+        self.zones = list(zones)
+
+    @classmethod
+    def cycles(cls, zone1, zone2, ncycles, purge=True):
+        """Pipeline repeating precursor 1, purge, precursor 2, purge ncycles times"""
+        unit = [zone1, Purge(), zone2, Purge()] if purge else [zone1, zone2]
+        return cls(unit*ncycles)
+
+    def run(self, av=1):
+        """Propagates the particles through all the zones
+
+        Args:
+            av (float or ndarray, optional) : fraction of sites available
+                to the first precursor at the inlet. It can carry extra
+                axes describing a distribution of particle states.
+
+        Returns:
+            A PipelineResult object
+
+        """
+        params = [np.asarray(av, dtype=float)]
+        for zone in self.zones:
+            if isinstance(zone, Zone):
+                params += [np.asarray(zone.Da), np.asarray(zone.t)]
+        shape = np.broadcast_shapes(*[p.shape for p in params])
+        a = np.broadcast_to(params[0], shape).astype(float)
+        avs = [a]
+        reacted = []
+        precursor = []
+        for zone in self.zones:
+            if zone.precursor == 2:
+                r, x = zone.react(1-a)
+                a = a + r
+            else:
+                r, x = zone.react(a)
+                a = a - r
+            avs.append(a)
+            reacted.append(np.broadcast_to(r, shape))
+            precursor.append(np.broadcast_to(x, shape))
+        first = np.array([zone.precursor == 1 for zone in self.zones], dtype=bool)
+        return PipelineResult(np.stack(avs), np.stack(reacted),
+            np.stack(precursor), first)
+
+
+_zone_models = {
+    PlugFlowSpatial : (_pfs_coverage, _pfs_precursor),
+    WellMixedSpatial : (_wm_coverage, _wm_precursor),
+}
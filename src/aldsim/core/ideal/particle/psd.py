@@ -0,0 +1,114 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Averages over particle surface area distributions
+
+All the particles of a bed share the same gas phase, and the reaction
+rate per site does not depend on the size of the particle. If y_i is
+the fraction of available sites of a size class with relative surface
+area r_i and number weight w_i, in the WellMixed model
+
+    dy_i/dt = -Da*x*y_i,  x = 1/(1+Da*sum(w_i*r_i*y_i))
+
+and likewise for the other models. All the classes start from y_i = 1
+and follow the same equation, so they keep the same fraction of
+available sites at all times, and the precursor only sees the total
+surface area. The surface coverage averaged weighting each class by
+its surface area and the precursor leaving the reactor are then those
+of a monodisperse powder with the same total surface area: the
+distribution only enters through its mean surface area.
+
+The distributions are discretized with Gauss quadratures, whose nodes
+are normalized to unit mean surface area.
+
+"""
+
+import numpy as np
+
+from .batch import PlugFlowMixed, WellMixed
+from .batch import plugflow as _pfm
+from .batch import wellmixed as _wm
+from .continuous import PlugFlowSpatial, WellMixedSpatial
+from .continuous import plugflow as _pfs
+
+
+class LogNormal:
+    """Log-normal distribution of the particle surface area
+
+    Args:
+        sigma (float) : standard deviation of the logarithm of the
+            surface area
+        n (int, optional) : number of Gauss-Hermite nodes
+
+    """
+
+    def __init__(self, sigma, n=64):
+        self.sigma = sigma
+        self.n = n
+
+    def nodes(self):
+        """Relative surface areas and number weights of the quadrature nodes"""
+        x, w = np.polynomial.hermite.hermgauss(self.n)
+        r = np.exp(np.sqrt(2)*self.sigma*x - 0.5*self.sigma**2)
+        return r, w/np.sqrt(np.pi)
+
+
+class Histogram:
+    """Measured distribution of the particle surface area
+
+    The number of particles is assumed to be uniform within each bin.
+
+    Args:
+        edges (ndarray) : edges of the bins, in any units of area
+        counts (ndarray) : number of particles in each bin
+        n (int, optional) : number of Gauss-Legendre nodes per bin
+
+    """
+
+    def __init__(self, edges, counts, n=8):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.asarray(counts, dtype=float)
+        self.n = n
+
+    def nodes(self):
+        """Relative surface areas and number weights of the quadrature nodes"""
+        x, w = np.polynomial.legendre.leggauss(self.n)
+        lo, width = self.edges[:-1,None], np.diff(self.edges)[:,None]
+        s = (lo + 0.5*width*(x+1)).ravel()
+        w = (0.5*w*self.counts[:,None]/np.sum(self.counts)).ravel()
+        return s/np.sum(w*s), w
+
+
+def average(model_cls, t, Da, dist):
+    """Surface coverage and precursor averaged over a surface area distribution
+
+    The size classes are coupled through the common precursor fraction,
+    so the result is that of the model at the Damkohler number of the
+    total surface area.
+
+    Args:
+        model_cls : one of the ideal non-dimensional model classes
+        t (float or ndarray) : normalized time
+        Da (float or ndarray) : Damkohler number for the mean surface area
+        dist : LogNormal or Histogram distribution
+
+    Returns:
+        A tuple of surface coverage, precursor arrays with shape
+        broadcast(t, Da)
+
+    """
+    try:
+        calc_coverage, calc_precursor = _averaged_models[model_cls]
+    except KeyError:
+        raise ValueError("No averaging for model %s" % model_cls.__name__)
+    r, w = dist.nodes()
+    Da = np.asarray(Da, dtype=float)*np.sum(w*r)
+    t = np.asarray(t, dtype=float)
+    return calc_coverage(Da, t)[()], calc_precursor(Da, t)[()]
+
+
+_averaged_models = {
+    PlugFlowMixed : (_pfm.calc_coverage, _pfm.calc_precursor),
+    WellMixed : (_wm.calc_coverage, _wm.calc_precursor),
+    PlugFlowSpatial : (_pfs.calc_coverage, _pfs.calc_precursor),
+    WellMixedSpatial : (_wm.calc_coverage, _wm.calc_precursor),
+}
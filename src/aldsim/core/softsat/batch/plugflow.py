@@ -1,10 +1,37 @@
 #Copyright © 2024, UChicago Argonne, LLC
 
 import numpy as np
-from aldsim.core.solvers import ode_solver
+from aldsim.solvers import ode_solver, bracketedNewton_solver, SolutionCache
+from aldsim.sampling import sample_curve
+from aldsim.result import SimulationResult
+from aldsim.parallel import map_chunks
+from .wellstirred import _z_from_coverage, _curves_chunk, _batch_tol
+from aldsim.instrument import labelled
 
 class PlugFlowMixed:
-    """Implement """
+    """Model for batch coating with two reaction pathways under plug flow approximations.
+
+    Implementation of a non-dimensional model for particle coating
+    by atomic layer deposition under a well mixed approximation for
+    particle mixing and plug flow approximation for precursor transport,
+    with a surface comprising two types of sites reacting through
+    first-order irreversible Langmuir kinetics.
+
+    The parameters can also be arrays, in which case they are broadcast
+    against each other and all the resulting parameter sets are
+    integrated simultaneously in a single solver call. For scalar
+    parameters, the dense solutions are kept in a LRU cache shared by
+    all instances, so that subsequent runs only interpolate.
+
+    Args:
+        D1 (float) : Damkohler number of the first reaction pathway
+        D2 (float) : Damkohler number of the second reaction pathway
+        f1 (float) : fraction of sites of the first reaction pathway
+        f2 (float) : fraction of sites of the second reaction pathway
+
+    """
+
+    cache = SolutionCache()
 
     def __init__(self, D1, D2, f1, f2):
         self.D1 = D1
@@ -13,23 +40,239 @@ class PlugFlowMixed:
         self.f2 = f2
         self.a = D2/D1
 
-    def _f(self, t, y):
-        """Provides the gradient for the fraction of available sites
-        of the first reaction pathway"""
+    def _fs(self, t, s):
+        """Provides the gradient for the logarithm of the fraction of
+        available sites of the first reaction pathway"""
+
+        dec = self.f1*self.D1*np.exp(s)+self.f2*self.D2*np.exp(self.a*s)
+        return - self.D1*_h(dec)
+
+    def _jac(self, t, s):
+        """Provides the diagonal of the Jacobian of _fs in LSODA's packed format"""
+        ys = self.f1*self.D1*np.exp(s)
+        yas = self.f2*self.D2*np.exp(self.a*s)
+        return np.atleast_2d(-self.D1*_hp(ys+yas)*(ys+self.a*yas))
+
+    def _integrate(self, tmax, t_eval):
+        """Integrates the fraction of available sites of the first pathway
+
+        The integration is carried out for the logarithm of the fraction
+        of available sites, which remains well conditioned when the
+        ratio D2/D1 is small. All parameter sets are integrated in a
+        single call using a diagonal Jacobian. The solver controls the
+        error norm of the whole batch, so the batch is integrated with
+        tighter tolerances, which keep the results independent of the
+        other parameter sets well below the accuracy of a single set.
+
+        Returns the time array and the fraction of available sites, with
+        shape broadcast(D1, D2, f1, f2) + t.shape
+
+        """
+        shape = np.broadcast(self.D1, self.D2, self.f1, self.f2).shape
+        if shape == ():
+            key = (float(self.D1), float(self.D2), float(self.f1), float(self.f2))
+            sol = self.cache.get(key, tmax, lambda tmax: ode_solver(self._fs,
+                [0], tmax, None, jac=self._jac, band=(0,0), dense_output=True).sol)
+            return t_eval, np.exp(sol(t_eval)[0])
+        params = np.broadcast_arrays(self.D1, self.D2, self.f1, self.f2)
+        m = type(self)(*[np.ravel(v).astype(float) for v in params])
+        out = ode_solver(m._fs, np.zeros(m.D1.size), tmax, t_eval=t_eval,
+            jac=m._jac, band=(0,0), **_batch_tol)
+        return out.t, np.exp(out.y).reshape(shape + (-1,))
+
+    def saturation_curve(self, tmax=5, dt=0.01, tol=None, executor=None):
+        """Calculates the saturation curve of the ALD process
+
+        Args:
+            tmax (float, optional): largest normalized dose time.
+            dt (float, optional): time step value.
+            tol (float, optional): if provided, the times are sampled
+                adaptively in [0, tmax] so that linear interpolation
+                between them is accurate within tol, and dt is ignored.
+                It requires scalar parameters.
+            executor (optional): None, an Executor from aldsim.parallel,
+                or 'thread' or 'process'. Batched parameter sets are
+                split into chunks integrated in parallel.
 
-        dec = self.f1*self.D1*y+self.f2*self.D2*np.float_power(y, self.a)
-        return - self.D1*y*(1-np.exp(-dec))/dec
+        Returns:
+            A tuple of time, surface coverage arrays
 
-    def saturation_curve(self, tmax=5):
-        out = ode_solver(self._f, [1], tmax, t_eval=np.arange(0,tmax,0.01))
-        y1 = out.y[0,:]
-        y2 = np.float_power(y1, self.a)
-        cov = self.f1*(1-y1) + self.f2*(1-y2)
-        return out.t, cov
+        """
+        t, cov, _, _, _ = self.run(tmax=tmax, dt=dt, tol=tol, executor=executor)
+        return t, cov
 
-    def run(self, tmax, dt):
-        raise NotImplementedError
-    
+    def run(self, tmax=5, dt=0.01, tol=None, executor=None, dtype=None):
+        """Runs the simulation for a given or predefined amount of time
+
+        Args:
+            tmax (float, optional): largest normalized dose time.
+            dt (float, optional): time step value.
+            tol (float, optional): if provided, the times are sampled
+                adaptively in [0, tmax] so that linear interpolation
+                between them is accurate within tol, and dt is ignored.
+                It requires scalar parameters.
+            executor (optional): None, an Executor from aldsim.parallel,
+                or 'thread' or 'process'. Batched parameter sets are
+                split into chunks integrated in parallel.
+            dtype (optional): data type of the stored curves, such as
+                float32 to halve their memory.
+
+        Returns:
+            A SimulationResult with time, surface coverage, precursor
+            utilization, and coverage of each reaction pathway, which
+            unpacks as a tuple
+
+        """
+        if tol is not None and np.broadcast(self.D1, self.D2, self.f1, self.f2).shape != ():
+            raise ValueError("Adaptive sampling requires scalar model parameters")
+        t, y = sample_curve(lambda t: self._curves(tmax, t, executor, dtype),
+            tmax, dt, tol)
+        return SimulationResult(t, ('coverage', 'precursor', 'coverage1',
+            'coverage2'), y)
+
+    def _curves(self, tmax, t, executor=None, dtype=None):
+        if executor is not None and np.broadcast(self.D1, self.D2, self.f1, self.f2).shape != ():
+            return np.array(map_chunks(_curves_chunk, dict(D1=self.D1, D2=self.D2,
+                f1=self.f1, f2=self.f2), executor, args=(type(self), tmax, t, dtype)))
+        _, y1 = self._integrate(tmax, t)
+        D1, D2, f1, f2, a = [np.expand_dims(v, -1) for v in
+            (self.D1, self.D2, self.f1, self.f2, self.a)]
+        y2 = np.float_power(y1, a)
+        shape = np.broadcast_shapes(y2.shape, D1.shape, D2.shape, f1.shape, f2.shape)
+        out = np.empty((4,) + shape, dtype=dtype)
+        out[0] = f1*(1-y1) + f2*(1-y2)
+        out[1] = np.exp(-f1*D1*y1 - f2*D2*y2)
+        out[2] = 1-y1
+        out[3] = 1-y2
+        return out
+
+    @labelled
     def calc_coverage(self, t):
-        raise NotImplementedError
-    
+        """Calculates the surface coverage
+
+        Calculates the surface coverage for a given normalized dose
+        time by inverting the implicit solution of the model. The
+        dose time is broadcast against the model parameters.
+
+        Args:
+            t (float or ndarray): the normalized dose time
+
+        Returns:
+            Surface coverage
+
+        """
+        return calc_coverage(self.D1, self.D2, self.f1, self.f2, t)
+
+    @labelled
+    def time_to_coverage(self, theta):
+        """Calculates the dose time required to reach a given coverage
+
+        Args:
+            theta (float or ndarray): the target surface coverage. It
+                is broadcast against the model parameters, and it has
+                to be smaller than f1+f2.
+
+        Returns:
+            A tuple of normalized dose time, precursor utilization
+
+        """
+        z = _z_from_coverage(theta, self.a, self.f1, self.f2)
+        t = _tau_z(z, np.asarray(self.D1, dtype=float), self.a, self.f1, self.f2)
+        dec = self.f1*self.D1*np.exp(-z) + self.f2*self.D2*np.exp(-self.a*z)
+        return t, np.exp(-dec)
+
+
+def calc_coverage(D1, D2, f1, f2, t):
+    """Surface coverage for the soft saturating PlugFlowMixed model
+
+    Solves the implicit expression of the coverage, written in terms of
+    z = -log(y1), where y1 is the fraction of available sites of the
+    first reaction pathway. All the arguments are broadcast against
+    each other.
+
+    """
+    D1, D2, f1, f2, t = [np.asarray(v, dtype=float) for v in (D1, D2, f1, f2, t)]
+    a = D2/D1
+    z0 = np.maximum(t/(1/D1+f1+a*f2), D1*(t-f1-f2))
+    z = bracketedNewton_solver(_f_z, _fp_z, 0, D1*t, x0=np.minimum(z0, D1*t),
+        args=(D1, a, f1, f2, t))
+    return -f1*np.expm1(-z) - f2*np.expm1(-a*z)
+
+
+def calc_time(D1, D2, f1, f2, y1):
+    """Normalized dose time for the soft saturating PlugFlowMixed model
+
+    Implicit solution of the model giving the normalized dose time at
+    which the fraction of available sites of the first reaction pathway
+    is y1. It comprises the explicit solution of the well stirred model
+    and a bounded correction evaluated by Gauss-Legendre quadrature.
+
+    """
+    D1, D2, f1, f2 = [np.asarray(v, dtype=float) for v in (D1, D2, f1, f2)]
+    return _tau_z(-np.log(y1), D1, D2/D1, f1, f2)
+
+
+def _tau_z(z, D1, a, f1, f2):
+    return z/D1 - f1*np.expm1(-z) - f2*np.expm1(-a*z) + \
+        _correction(z, D1, a, f1, f2)/D1
+
+
+def _correction(z, D1, a, f1, f2):
+    """Integral of B(d)-1 over log(y1) from -z to 0, with B(d) = d/(exp(d)-1)
+
+    The interval is split in panels bounded by the regions where each
+    reaction pathway transitions from d >> 1 to d << 1, so that the
+    Gauss-Legendre nodes are placed where the integrand varies.
+
+    """
+    z, D1, a, f1, f2 = np.broadcast_arrays(z, D1, a, f1, f2)
+    d0 = f1*D1 + f2*a*D1
+    with np.errstate(divide='ignore'):
+        smin = (_logeps - np.log(d0))/np.minimum(a, 1)
+        s1 = -np.log(f1*D1)
+        s2 = -np.log(f2*a*D1)/a
+    sl = np.clip(-z, np.minimum(smin, 0), 0)
+    edges = np.stack([sl, 0*sl, s1-4, s1+4, s2-4/a, s2+4/a], axis=-1)
+    edges = np.sort(np.clip(np.nan_to_num(edges), sl[...,None], 0), axis=-1)
+    lo, width = edges[...,:-1,None], np.diff(edges, axis=-1)[...,None]
+    sigma = (lo + width*_nodes).reshape(z.shape + (-1,))
+    w = (width*_weights).reshape(z.shape + (-1,))
+    d = f1[...,None]*D1[...,None]*np.exp(sigma) + \
+        f2[...,None]*a[...,None]*D1[...,None]*np.exp(a[...,None]*sigma)
+    return np.sum(w*(_B(d)-1), axis=-1)
+
+
+def _B(d):
+    """Evaluates d/(exp(d)-1), using a series expansion close to d=0"""
+    small = np.abs(d) < 1e-4
+    ds = np.where(small, 1.0, d)
+    with np.errstate(over='ignore'):
+        return np.where(small, 1-d/2+d*d/12, ds/np.expm1(ds))
+
+
+def _f_z(z, D1, a, f1, f2, t):
+    return _tau_z(z, D1, a, f1, f2) - t
+
+
+def _fp_z(z, D1, a, f1, f2, t):
+    d = f1*D1*np.exp(-z) + f2*a*D1*np.exp(-a*z)
+    return 1/(D1*_h(d))
+
+
+_nodes, _weights = np.polynomial.legendre.leggauss(16)
+_nodes, _weights = 0.5*(_nodes+1), 0.5*_weights
+_logeps = np.log(1e-16)
+
+
+def _h(d):
+    """Evaluates (1-exp(-d))/d, using a series expansion close to d=0"""
+    small = np.abs(d) < 1e-4
+    ds = np.where(small, 1.0, d)
+    return np.where(small, 1-d/2+d*d/6, -np.expm1(-ds)/ds)
+
+
+def _hp(d):
+    """Derivative of (1-exp(-d))/d"""
+    small = np.abs(d) < 1e-4
+    ds = np.where(small, 1.0, d)
+    return np.where(small, -0.5+d/3, (np.exp(-ds)*(1+ds)-1)/ds**2)
@@ -1,10 +1,39 @@
 #Copyright © 2024, UChicago Argonne, LLC
 
 import numpy as np
-from aldsim.solvers import ode_solver
+from aldsim.solvers import ode_solver, bracketedNewton_solver, SolutionCache
+from aldsim.sampling import sample_curve
+from aldsim.result import SimulationResult
+from aldsim.parallel import map_chunks
+from aldsim.instrument import labelled
+
+# Tolerances of the batched integration, whose error norm is shared by
+# all the parameter sets of the batch
+_batch_tol = dict(rtol=1e-8, atol=1e-10)
 
 class WellStirred:
-    """Implement """
+    """Model for batch coating with two reaction pathways under well stirred approximations.
+
+    Implementation of a non-dimensional model for particle coating
+    by atomic layer deposition under a well stirred approximation for
+    precursor transport, with a surface comprising two types of sites
+    reacting through first-order irreversible Langmuir kinetics.
+
+    The parameters can also be arrays, in which case they are broadcast
+    against each other and all the resulting parameter sets are
+    integrated simultaneously in a single solver call. For scalar
+    parameters, the dense solutions are kept in a LRU cache shared by
+    all instances, so that subsequent runs only interpolate.
+
+    Args:
+        D1 (float) : Damkohler number of the first reaction pathway
+        D2 (float) : Damkohler number of the second reaction pathway
+        f1 (float) : fraction of sites of the first reaction pathway
+        f2 (float) : fraction of sites of the second reaction pathway
+
+    """
+
+    cache = SolutionCache()
 
     def __init__(self, D1, D2, f1, f2):
         self.D1 = D1
@@ -13,27 +42,218 @@ class WellStirred:
         self.f2 = f2
         self.a = D2/D1
 
-    def _f(self, t, y):
-        """Provides the gradient for the fraction of available sites
-        of the first reaction pathway"""
-
-        dec = 1+self.f1*self.D1*y+self.f2*self.D2*np.float_power(y, self.a)
-        return - self.D1*y/dec
-
-    def saturation_curve(self, tmax=5, dt=0.01):
-        t, c, _, _, _ = self.run(tmax=tmax, dt=dt)
-        return t, c
-
-    def run(self, tmax=5, dt=0.01):
-        out = ode_solver(self._f, [1], tmax, t_eval=np.arange(0,tmax,dt))
-        y1 = out.y[0,:]
-        y2 = np.float_power(y1, self.a)
-        cov1 = 1-y1
-        cov2 = 1-y2
-        cov = self.f1*cov1 + self.f2*cov2
-        x = 1/(1+self.f1*y1 + self.f2*y2)
-        return out.t, cov, x, cov1, cov2
-    
+    def _fs(self, t, s):
+        """Provides the gradient for the logarithm of the fraction of
+        available sites of the first reaction pathway"""
+
+        dec = 1+self.f1*self.D1*np.exp(s)+self.f2*self.D2*np.exp(self.a*s)
+        return - self.D1/dec
+
+    def _jac(self, t, s):
+        """Provides the diagonal of the Jacobian of _fs in LSODA's packed format"""
+        ys = self.f1*self.D1*np.exp(s)
+        yas = self.f2*self.D2*np.exp(self.a*s)
+        return np.atleast_2d(self.D1*(ys+self.a*yas)/(1+ys+yas)**2)
+
+    def _integrate(self, tmax, t_eval):
+        """Integrates the fraction of available sites of the first pathway
+
+        The integration is carried out for the logarithm of the fraction
+        of available sites, which remains well conditioned when the
+        ratio D2/D1 is small. All parameter sets are integrated in a
+        single call using a diagonal Jacobian. The solver controls the
+        error norm of the whole batch, so the batch is integrated with
+        tighter tolerances, which keep the results independent of the
+        other parameter sets well below the accuracy of a single set.
+
+        Returns the time array and the fraction of available sites, with
+        shape broadcast(D1, D2, f1, f2) + t.shape
+
+        """
+        shape = np.broadcast(self.D1, self.D2, self.f1, self.f2).shape
+        if shape == ():
+            key = (float(self.D1), float(self.D2), float(self.f1), float(self.f2))
+            sol = self.cache.get(key, tmax, lambda tmax: ode_solver(self._fs,
+                [0], tmax, None, jac=self._jac, band=(0,0), dense_output=True).sol)
+            return t_eval, np.exp(sol(t_eval)[0])
+        params = np.broadcast_arrays(self.D1, self.D2, self.f1, self.f2)
+        m = type(self)(*[np.ravel(v).astype(float) for v in params])
+        out = ode_solver(m._fs, np.zeros(m.D1.size), tmax, t_eval=t_eval,
+            jac=m._jac, band=(0,0), **_batch_tol)
+        return out.t, np.exp(out.y).reshape(shape + (-1,))
+
+    def saturation_curve(self, tmax=5, dt=0.01, tol=None, executor=None):
+        """Calculates the saturation curve of the ALD process
+
+        Args:
+            tmax (float, optional): largest normalized dose time.
+            dt (float, optional): time step value.
+            tol (float, optional): if provided, the times are sampled
+                adaptively in [0, tmax] so that linear interpolation
+                between them is accurate within tol, and dt is ignored.
+                It requires scalar parameters.
+            executor (optional): None, an Executor from aldsim.parallel,
+                or 'thread' or 'process'. Batched parameter sets are
+                split into chunks integrated in parallel.
+
+        Returns:
+            A tuple of time, surface coverage arrays
+
+        """
+        t, cov, _, _, _ = self.run(tmax=tmax, dt=dt, tol=tol, executor=executor)
+        return t, cov
+
+    def run(self, tmax=5, dt=0.01, tol=None, executor=None, dtype=None):
+        """Runs the simulation for a given or predefined amount of time
+
+        Args:
+            tmax (float, optional): largest normalized dose time.
+            dt (float, optional): time step value.
+            tol (float, optional): if provided, the times are sampled
+                adaptively in [0, tmax] so that linear interpolation
+                between them is accurate within tol, and dt is ignored.
+                It requires scalar parameters.
+            executor (optional): None, an Executor from aldsim.parallel,
+                or 'thread' or 'process'. Batched parameter sets are
+                split into chunks integrated in parallel.
+            dtype (optional): data type of the stored curves, such as
+                float32 to halve their memory.
+
+        Returns:
+            A SimulationResult with time, surface coverage, precursor
+            utilization, and coverage of each reaction pathway, which
+            unpacks as a tuple
+
+        """
+        if tol is not None and np.broadcast(self.D1, self.D2, self.f1, self.f2).shape != ():
+            raise ValueError("Adaptive sampling requires scalar model parameters")
+        t, y = sample_curve(lambda t: self._curves(tmax, t, executor, dtype),
+            tmax, dt, tol)
+        return SimulationResult(t, ('coverage', 'precursor', 'coverage1',
+            'coverage2'), y)
+
+    def _curves(self, tmax, t, executor=None, dtype=None):
+        if executor is not None and np.broadcast(self.D1, self.D2, self.f1, self.f2).shape != ():
+            return np.array(map_chunks(_curves_chunk, dict(D1=self.D1, D2=self.D2,
+                f1=self.f1, f2=self.f2), executor, args=(type(self), tmax, t, dtype)))
+        _, y1 = self._integrate(tmax, t)
+        D1, D2, f1, f2, a = [np.expand_dims(v, -1) for v in
+            (self.D1, self.D2, self.f1, self.f2, self.a)]
+        y2 = np.float_power(y1, a)
+        shape = np.broadcast_shapes(y2.shape, D1.shape, D2.shape, f1.shape, f2.shape)
+        out = np.empty((4,) + shape, dtype=dtype)
+        out[0] = f1*(1-y1) + f2*(1-y2)
+        out[1] = 1/(1+f1*D1*y1 + f2*D2*y2)
+        out[2] = 1-y1
+        out[3] = 1-y2
+        return out
+
+    @labelled
     def calc_coverage(self, t):
-        raise NotImplementedError
-    
+        """Calculates the surface coverage
+
+        Calculates the surface coverage for a given normalized dose
+        time by inverting the implicit solution of the model. The
+        dose time is broadcast against the model parameters.
+
+        Args:
+            t (float or ndarray): the normalized dose time
+
+        Returns:
+            Surface coverage
+
+        """
+        return calc_coverage(self.D1, self.D2, self.f1, self.f2, t)
+
+    @labelled
+    def time_to_coverage(self, theta):
+        """Calculates the dose time required to reach a given coverage
+
+        Args:
+            theta (float or ndarray): the target surface coverage. It
+                is broadcast against the model parameters, and it has
+                to be smaller than f1+f2.
+
+        Returns:
+            A tuple of normalized dose time, precursor utilization
+
+        """
+        z = _z_from_coverage(theta, self.a, self.f1, self.f2)
+        y1 = np.exp(-z)
+        y2 = np.exp(-self.a*z)
+        t = z/self.D1 + self.f1*(1-y1) + self.f2*(1-y2)
+        return t, 1/(1+self.f1*self.D1*y1 + self.f2*self.D2*y2)
+
+
+def calc_coverage(D1, D2, f1, f2, t):
+    """Surface coverage for the soft saturating WellStirred model
+
+    Solves the implicit expression of the coverage, written in terms of
+    z = -log(y1), where y1 is the fraction of available sites of the
+    first reaction pathway. All the arguments are broadcast against
+    each other.
+
+    """
+    D1, D2, f1, f2, t = [np.asarray(v, dtype=float) for v in (D1, D2, f1, f2, t)]
+    a = D2/D1
+    z = _calc_z(D1, a, f1, f2, t)
+    return -f1*np.expm1(-z) - f2*np.expm1(-a*z)
+
+
+def calc_unreacted(D1, D2, f1, f2, t):
+    """Fraction of available sites of the first reaction pathway
+
+    Solves the same implicit expression as calc_coverage. All the
+    arguments are broadcast against each other.
+
+    """
+    D1, D2, f1, f2, t = [np.asarray(v, dtype=float) for v in (D1, D2, f1, f2, t)]
+    return np.exp(-_calc_z(D1, D2/D1, f1, f2, t))
+
+
+def calc_time(D1, D2, f1, f2, y1):
+    """Normalized dose time for the soft saturating WellStirred model
+
+    Explicit solution of the model giving the normalized dose time at
+    which the fraction of available sites of the first reaction pathway
+    is y1.
+
+    """
+    y1 = np.asarray(y1, dtype=float)
+    return -np.log(y1)/D1 + f1*(1-y1) + f2*(1-np.float_power(y1, D2/D1))
+
+
+def _curves_chunk(model_cls, tmax, t, dtype, D1, D2, f1, f2):
+    """Curves of a chunk of parameter sets, with the parameter sets as first axis"""
+    return tuple(model_cls(D1, D2, f1, f2)._curves(tmax, t, dtype=dtype))
+
+
+def _calc_z(D1, a, f1, f2, t):
+    """Solves the implicit solution at time t for z = -log(y1)"""
+    z0 = np.maximum(t/(1/D1+f1+a*f2), D1*(t-f1-f2))
+    return bracketedNewton_solver(_f_z, _fp_z, 0, D1*t, x0=np.minimum(z0, D1*t),
+        args=(D1, a, f1, f2, t))
+
+
+def _f_z(z, D1, a, f1, f2, t):
+    return z/D1 - f1*np.expm1(-z) - f2*np.expm1(-a*z) - t
+
+
+def _fp_z(z, D1, a, f1, f2, t):
+    return 1/D1 + f1*np.exp(-z) + a*f2*np.exp(-a*z)
+
+
+def _z_from_coverage(theta, a, f1, f2):
+    """Solves f1*(1-exp(-z)) + f2*(1-exp(-a*z)) = theta for z = -log(y1)"""
+    theta, a, f1, f2 = [np.asarray(v, dtype=float) for v in (theta, a, f1, f2)]
+    with np.errstate(divide='ignore'):
+        zmax = -np.log1p(-theta/(f1+f2))/np.minimum(a, 1)
+    return bracketedNewton_solver(_fc_z, _fpc_z, 0, zmax, args=(a, f1, f2, theta))
+
+
+def _fc_z(z, a, f1, f2, theta):
+    return -f1*np.expm1(-z) - f2*np.expm1(-a*z) - theta
+
+
+def _fpc_z(z, a, f1, f2, theta):
+    return f1*np.exp(-z) + a*f2*np.exp(-a*z)
@@ -0,0 +1,122 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Multi-cycle simulation of ALD processes
+
+An ALD cycle alternates a dose of the first precursor, which reacts
+with the fraction av of sites available to it, and a dose of the second
+precursor, which reacts with the sites terminated by the first one and
+makes them available again. Incomplete reactions are carried from one
+cycle into the next.
+
+Cycles are produced by a generator, so that long runs are streamed in
+constant memory. Once the fraction of available sites changes by less
+than a tolerance from one cycle to the next, the process has reached
+its steady periodic regime and the remaining cycles are extrapolated
+without evaluating the dose models.
+
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .aldmodel import aldmodel
+from .models.dose import ZeroD
+
+
+Cycle = namedtuple('Cycle', ['n', 'growth', 'cov1', 'cov2', 'prec1', 'prec2',
+    'av', 'steady'])
+Cycle.__doc__ = """Output of a single ALD cycle
+
+    Args:
+        n (int) : cycle number, starting at 1
+        growth (float) : growth, as a fraction of the saturated growth
+            per cycle. It equals the fraction of sites reacting with
+            the first precursor.
+        cov1 (float) : fraction of sites terminated by the first
+            precursor at the end of its dose
+        cov2 (float) : fraction of sites terminated by the second
+            precursor at the end of its dose
+        prec1 (float) : fraction of the first precursor consumed during
+            its dose. It is NaN for the ZeroD model.
+        prec2 (float) : fraction of the second precursor consumed
+            during its dose. It is NaN for the ZeroD model.
+        av (float) : fraction of sites available to the first
+            precursor at the start of the cycle
+        steady (bool) : True for cycles extrapolated from the steady
+            periodic regime
+
+"""
+
+
+def run_cycles(model1, model2, t1, t2, ncycles=None, av=1, tol=1e-12):
+    """Simulates ALD cycles alternating two dose models
+
+    Args:
+        model1 : dose model of the first half-reaction
+        model2 : dose model of the second half-reaction
+        t1 (float) : dose time of the first precursor, in seconds
+        t2 (float) : dose time of the second precursor, in seconds
+        ncycles (int, optional) : number of cycles. If None, the
+            generator never stops.
+        av (float, optional) : fraction of sites available to the first
+            precursor at the start of the first cycle
+        tol (float, optional) : change in av below which the process is
+            considered to be in the steady periodic regime
+
+    Yields:
+        A Cycle namedtuple per cycle
+
+    """
+    n = 0
+    steady = None
+    while ncycles is None or n < ncycles:
+        n += 1
+        if steady is not None:
+            yield steady._replace(n=n)
+            continue
+        r1 = av*model1.calc_coverage(t1, av)
+        b = 1 - av + r1
+        r2 = b*model2.calc_coverage(t2, b)
+        av_next = 1 - b + r2
+        cycle = Cycle(n, r1, b, av_next, _consumed(model1, t1, r1),
+            _consumed(model2, t2, r2), av, False)
+        yield cycle
+        if abs(av_next - av) <= tol:
+            steady = cycle._replace(steady=True)
+        av = av_next
+
+
+def process_cycles(process, model_name, ncycles=None, av=1, tol=1e-12, **kwargs):
+    """Simulates the cycles of an ALDProcess
+
+    The dose times of the process, n1 and n2, are given in seconds.
+    Both half-reactions are simulated with the same dose model.
+
+    Args:
+        process : ALDProcess object
+        model_name (str) : name of the dose model, as in aldmodel
+        ncycles (int, optional) : number of cycles
+        av (float, optional) : initial fraction of available sites
+        tol (float, optional) : tolerance for the steady periodic regime
+        **kwargs : parameters of the dose model
+
+    Yields:
+        A Cycle namedtuple per cycle
+
+    """
+    model1 = aldmodel(process.chem1, model_name, **kwargs)
+    model2 = aldmodel(process.chem2, model_name, **kwargs)
+    return run_cycles(model1, model2, process.n1, process.n2, ncycles, av, tol)
+
+
+def _consumed(model, t, reacted):
+    """Fraction of the precursor delivered during a dose that reacts
+
+    The normalized dose time t/t0 is the amount of precursor delivered
+    in units of the total number of surface sites.
+
+    """
+    if isinstance(model, ZeroD):
+        return np.nan
+    return reacted*model.t0()/t
@@ -0,0 +1,347 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Batch least-squares calibration from measured saturation curves
+
+Many independent saturation curves are fitted concurrently using a
+vectorized Levenberg-Marquardt algorithm. The models provide the
+Jacobian of the curve with respect to their parameters, either in
+closed form or by implicit differentiation of the implicit solution
+of the non-dimensional models, so that no integrator is involved.
+
+Datasets can have different numbers of points: they are padded with
+NaN values, which are excluded from the fit.
+
+"""
+
+import numpy as np
+
+from .constants import kb
+from .core.ideal.particle.batch import PlugFlowMixed, WellMixed
+from .core.ideal.particle.batch import plugflow as _pfm
+from .core.ideal.particle.batch import wellmixed as _wm
+from .core.ideal.particle.continuous import PlugFlowSpatial, WellMixedSpatial
+from .core.ideal.particle.continuous import plugflow as _pfs
+from .models.dose.batch import WellStirred, ParticlePlugFlow
+
+
+class Exponential:
+    """Saturation curve A*(1-exp(-k*t)) of the ZeroD model
+
+    The rate k = 1/t0 is related to the ALDideal parameters through
+    calc_beta0 or calc_site_area.
+
+    """
+
+    names = ('A', 'k')
+    transforms = ('lin', 'log')
+
+    def guess(self, t, y):
+        A, t63 = _scale(t, y)
+        return np.stack([A, 1/t63], axis=-1)
+
+    def jac(self, t, p):
+        A, k = p[:,0,None], p[:,1,None]
+        e = np.exp(-k*t)
+        return A*(1-e), np.stack([1-e, A*t*e], axis=-1)
+
+
+class DoubleExponential:
+    """Saturation curve of the ALDsoft kinetics
+
+    The curve is A*(f1*(1-exp(-k1*t)) + (1-f1)*(1-exp(-k2*t))), where
+    f1 is the normalized fraction of sites of the first reaction pathway.
+    The rates are related to the ALDsoft parameters through calc_soft.
+
+    """
+
+    names = ('A', 'k1', 'k2', 'f1')
+    transforms = ('lin', 'log', 'log', 'logit')
+
+    def guess(self, t, y):
+        A, t63 = _scale(t, y)
+        return np.stack([A, 3/t63, 0.3/t63, 0.5+0*A], axis=-1)
+
+    def jac(self, t, p):
+        A, k1, k2, f1 = [p[:,i,None] for i in range(4)]
+        e1 = np.exp(-k1*t)
+        e2 = np.exp(-k2*t)
+        c = f1*(1-e1) + (1-f1)*(1-e2)
+        return A*c, np.stack([c, A*f1*t*e1, A*(1-f1)*t*e2, A*(e2-e1)], axis=-1)
+
+
+class Saturation:
+    """Saturation curve A*theta(t/t0; Da) of a non-dimensional model
+
+    Args:
+        model_cls : one of the ideal non-dimensional model classes, or
+            the WellStirred and ParticlePlugFlow dose models, which are
+            fitted through their non-dimensional counterparts. The
+            fitted Da and t0 are related to beta0 and the site area
+            through calc_dose.
+
+    """
+
+    names = ('A', 'Da', 't0')
+    transforms = ('lin', 'log', 'log')
+
+    def __init__(self, model_cls):
+        try:
+            self._derivatives, self._time = _derivatives[model_cls]
+        except KeyError:
+            raise ValueError("No derivatives for model %s" % model_cls.__name__)
+        self.model_cls = model_cls
+
+    def guess(self, t, y):
+        A, t63 = _scale(t, y)
+        Da = np.ones_like(A)
+        return np.stack([A, Da, t63/self._time(Da, 1-np.exp(-1))], axis=-1)
+
+    def jac(self, t, p):
+        A, Da, t0 = p[:,0,None], p[:,1,None], p[:,2,None]
+        tau = t/t0
+        theta, dtau, dDa = self._derivatives(Da, tau)
+        return A*theta, np.stack([theta, A*dDa, -A*dtau*tau/t0], axis=-1)
+
+
+class FitResult:
+    """Parameters fitted to a set of saturation curves
+
+    Args:
+        names (tuple) : names of the parameters
+        values (ndarray) : array of shape (K, nparams) with the fitted
+            parameters of each dataset
+        stderr (ndarray) : standard errors of the parameters
+        cost (ndarray) : half the weighted sum of squared residuals
+        converged (ndarray) : whether each fit met the tolerances
+        nit (int) : number of iterations
+
+    """
+
+    def __init__(self, names, values, stderr, cost, converged, nit):
+        self.names = names
+        self.values = values
+        self.stderr = stderr
+        self.cost = cost
+        self.converged = converged
+        self.nit = nit
+
+    def __getitem__(self, name):
+        return self.values[:,self.names.index(name)]
+
+
+def fit_curves(model, t, y, p0=None, sigma=None, maxiter=200, xtol=1e-10,
+        ftol=1e-14):
+    """Fits many saturation curves concurrently
+
+    Args:
+        model : Exponential, DoubleExponential or Saturation instance
+        t (ndarray or list) : dose times, either a (K, n) array padded with
+            NaN or a list of K 1D arrays
+        y (ndarray or list) : measured values, with the same layout as t
+        p0 (ndarray, optional) : (K, nparams) initial guess. By default it
+            is estimated from the data.
+        sigma (ndarray or list, optional) : uncertainty of each value
+        maxiter (int, optional) : maximum number of iterations
+        xtol (float, optional) : relative tolerance on the parameters
+        ftol (float, optional) : relative tolerance on the cost
+
+    Returns:
+        A FitResult object
+
+    """
+    t, y, w = _pack(t, y, sigma)
+    K = t.shape[0]
+    p = model.guess(t, y) if p0 is None else np.array(p0, dtype=float).reshape(K, -1)
+    q = _to_internal(p, model.transforms)
+    r, J = _residuals(model, t, y, w, q)
+    cost = 0.5*np.sum(r*r, axis=-1)
+    lam = np.full(K, 1e-3)
+    active = np.ones(K, dtype=bool)
+    converged = np.zeros(K, dtype=bool)
+    nit = 0
+    while nit < maxiter and np.any(active):
+        nit += 1
+        i = np.nonzero(active)[0]
+        JtJ = np.einsum('kni,knj->kij', J[i], J[i])
+        g = np.einsum('kni,kn->ki', J[i], r[i])
+        d = np.einsum('kii->ki', JtJ)
+        A = JtJ + (lam[i,None]*d + 1e-30)[...,None]*np.eye(q.shape[1])
+        dq = -np.linalg.solve(A, g[...,None])[...,0]
+        rn, Jn = _residuals(model, t[i], y[i], w[i], q[i]+dq)
+        costn = 0.5*np.sum(rn*rn, axis=-1)
+        better = np.isfinite(costn) & (costn <= cost[i])
+        small = np.all(np.abs(dq) <= xtol*(np.abs(q[i])+xtol), axis=-1)
+        done = small | (better & (cost[i]-costn <= ftol*cost[i]))
+        j = i[better]
+        q[j] += dq[better]
+        r[j], J[j], cost[j] = rn[better], Jn[better], costn[better]
+        lam[i] = np.where(better, 0.1*lam[i], 10*lam[i])
+        converged[i[done]] = True
+        active[i[done | (lam[i] > 1e16)]] = False
+    p = _from_internal(q, model.transforms)
+    return FitResult(model.names, p, _stderr(J, r, w, p, model.transforms),
+        cost, converged, nit)
+
+
+def calc_beta0(chem, T, p, k):
+    """Bare reaction probability from the rate fitted with Exponential
+
+    It uses the site area of chem, and T, p are the temperature (in K)
+    and pressure (in Pa) of the experiments.
+
+    """
+    return k/(chem.site_area*chem.Jwall(T, p))
+
+
+def calc_site_area(chem, T, p, k):
+    """Site area from the rate fitted with Exponential
+
+    It uses the bare reaction probability of chem, and T, p are the
+    temperature (in K) and pressure (in Pa) of the experiments.
+
+    """
+    return k/(chem.beta0*chem.Jwall(T, p))
+
+
+def calc_soft(chem, T, p, k1, k2):
+    """Reaction probabilities of an ALDsoft kinetics from the fitted rates
+
+    Returns:
+        A tuple of beta1, beta2
+
+    """
+    c = chem.site_area*chem.Jwall(T, p)
+    return k1/c, k2/c
+
+
+def calc_dose(model, Da, t0):
+    """Bare reaction probability and site area from a fitted dose model
+
+    Inverts the Damkohler number and characteristic time of the
+    WellStirred and ParticlePlugFlow dose models.
+
+    Returns:
+        A tuple of beta0, site_area
+
+    """
+    flow = model.flow()
+    beta0 = Da*flow/(0.25*model.S*model.vth*model.chem.f)
+    site_area = kb*model.T*model.S/(flow*model.p*t0)
+    return beta0, site_area
+
+
+def _pack(t, y, sigma):
+    if isinstance(t, (list, tuple)):
+        n = max(len(ti) for ti in t)
+        tp, yp, sp = [np.full((len(t), n), np.nan) for _ in range(3)]
+        for k in range(len(t)):
+            tp[k,:len(t[k])] = t[k]
+            yp[k,:len(y[k])] = y[k]
+            sp[k,:len(t[k])] = 1 if sigma is None else sigma[k]
+        t, y, sigma = tp, yp, sp
+    t = np.atleast_2d(np.asarray(t, dtype=float))
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    sigma = np.ones_like(t) if sigma is None else \
+        np.broadcast_to(np.asarray(sigma, dtype=float), t.shape)
+    valid = np.isfinite(t) & np.isfinite(y)
+    w = np.where(valid, 1/np.where(valid, sigma, 1), 0)
+    return np.where(valid, t, 0), np.where(valid, y, 0), w
+
+
+def _scale(t, y):
+    """Estimates the saturation value and the time to reach 63% of it"""
+    A = np.max(np.where(y > 0, y, 0), axis=-1)
+    reached = y >= (1-np.exp(-1))*A[:,None]
+    tm = np.max(t, axis=-1)
+    t63 = np.min(np.where(reached & (t > 0), t, np.inf), axis=-1)
+    return np.where(A > 0, A, 1), np.where(np.isfinite(t63), t63, tm)
+
+
+def _residuals(model, t, y, w, q):
+    p = _from_internal(q, model.transforms)
+    f, J = model.jac(t, p)
+    return w*(f-y), w[...,None]*J*_dp_dq(p, model.transforms)[:,None,:]
+
+
+def _to_internal(p, transforms):
+    q = np.array(p, dtype=float)
+    for i, tr in enumerate(transforms):
+        if tr == 'log':
+            q[:,i] = np.log(p[:,i])
+        elif tr == 'logit':
+            q[:,i] = np.log(p[:,i]/(1-p[:,i]))
+    return q
+
+
+def _from_internal(q, transforms):
+    p = np.array(q, dtype=float)
+    for i, tr in enumerate(transforms):
+        if tr == 'log':
+            p[:,i] = np.exp(q[:,i])
+        elif tr == 'logit':
+            p[:,i] = 1/(1+np.exp(-q[:,i]))
+    return p
+
+
+def _dp_dq(p, transforms):
+    dp = np.ones_like(p)
+    for i, tr in enumerate(transforms):
+        if tr == 'log':
+            dp[:,i] = p[:,i]
+        elif tr == 'logit':
+            dp[:,i] = p[:,i]*(1-p[:,i])
+    return dp
+
+
+def _stderr(J, r, w, p, transforms):
+    """Standard errors from the Gauss-Newton approximation of the Hessian"""
+    dof = np.maximum(np.count_nonzero(w, axis=-1) - p.shape[1], 1)
+    s2 = np.sum(r*r, axis=-1)/dof
+    JtJ = np.einsum('kni,knj->kij', J, J)
+    with np.errstate(invalid='ignore'):
+        cov = np.linalg.pinv(JtJ)
+        return np.sqrt(np.einsum('kii->ki', cov)*s2[:,None])*_dp_dq(p, transforms)
+
+
+def _wellmixed(Da, tau):
+    """Coverage of the WellMixed model and its derivatives
+
+    Obtained by implicit differentiation of tau = theta - log(1-theta)/Da
+
+    """
+    y = _wm.calc_unreacted(Da, tau)
+    ylogy = np.where(y > 0, y*np.log(np.where(y > 0, y, 1)), 0)
+    return 1-y, Da*y/(1+Da*y), -ylogy/(Da*(1+Da*y))
+
+
+def _plugflow(Da, tau):
+    """Coverage of the PlugFlowMixed model and its derivatives
+
+    Obtained by implicit differentiation of the expression of the
+    dose time as a function of the fraction of unreacted sites
+
+    """
+    y = _pfm.calc_unreacted(Da, tau)
+    c = -np.expm1(-Da*y)
+    return 1-y, c, -(c/-np.expm1(-Da) - y - tau*c)/Da
+
+
+def _plugflow_spatial(Da, tau):
+    """Coverage of the PlugFlowSpatial model and its derivatives"""
+    u = Da*(1-tau)
+    with np.errstate(over='ignore', invalid='ignore'):
+        e = np.exp(-u)
+        g = Da*_pfs._exprel(-u) + e
+        dtau = Da*(Da*_pfs._exprel_prime(-u) + e)/g**2
+        dDa = (_pfs._exprel(-u) - u*_pfs._exprel_prime(-u) - u*e/Da)/g**2
+    return 1-1/g, np.nan_to_num(dtau, posinf=0), np.nan_to_num(dDa, posinf=0)
+
+
+_derivatives = {
+    WellMixed : (_wellmixed, _wm.calc_time),
+    WellMixedSpatial : (_wellmixed, _wm.calc_time),
+    WellStirred : (_wellmixed, _wm.calc_time),
+    PlugFlowMixed : (_plugflow, _pfm.calc_time),
+    ParticlePlugFlow : (_plugflow, _pfm.calc_time),
+    PlugFlowSpatial : (_plugflow_spatial, _pfs.calc_time),
+}
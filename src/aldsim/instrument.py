@@ -0,0 +1,128 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Opt-in instrumentation of the ODE and Newton solvers
+
+Solver calls are only recorded while a Recorder is active:
+
+    with Recorder() as rec:
+        model.run()
+    print(rec.summary())
+
+Each call is labeled with the model class on whose behalf the solver
+runs: model methods that call the solvers through module functions are
+decorated with labelled, and bound methods passed to the solvers are
+labeled with their class. Other calls are labeled with the function
+name. When no Recorder is active, the solvers only check that the
+stack of active recorders is empty.
+
+"""
+
+import functools
+import json
+import time
+
+_active = []
+_owners = []
+
+
+class Recorder:
+    """Records counters and wall time of the solver calls
+
+    The ODE solver records the number of evaluations of the right hand
+    side (nfev), of the Jacobian (njev), LU decompositions (nlu) and
+    accepted steps. LSODA does not report rejected steps, which are
+    recorded as None. The Newton solvers record the number of
+    iterations, function evaluations and bisection or damping steps.
+
+    Recorders can be nested, in which case each call is recorded by
+    all of them.
+
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def start(self):
+        _active.append(self)
+        return self
+
+    def stop(self):
+        _active.remove(self)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def clear(self):
+        self.calls = []
+
+    def summary(self):
+        """Aggregates the counters of the calls sharing solver and label"""
+        out = {}
+        for call in self.calls:
+            key = '%s:%s' % (call['solver'], call['label'])
+            entry = out.setdefault(key, {'calls': 0})
+            entry['calls'] += 1
+            for name, value in call.items():
+                if name in ('solver', 'label'):
+                    continue
+                if value is None or entry.get(name, 0) is None:
+                    entry[name] = None
+                else:
+                    entry[name] = entry.get(name, 0) + value
+        return out
+
+    def to_dict(self):
+        return {'calls': list(self.calls), 'summary': self.summary()}
+
+    def to_json(self, path=None, **kwargs):
+        """Returns the records as a JSON string, also writing them to path if given"""
+        s = json.dumps(self.to_dict(), **kwargs)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(s)
+        return s
+
+
+def is_active():
+    return len(_active) > 0
+
+
+def add_call(solver, f, **counters):
+    """Adds a solver call to all the active recorders"""
+    call = {'solver': solver,
+        'label': _class_label(_owners[-1]) if _owners else label(f)}
+    call.update(counters)
+    for rec in _active:
+        rec.calls.append(call)
+
+
+def labelled(method):
+    """Decorator labeling the solver calls made by a method with its model class"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        _owners.append(self)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _owners.pop()
+    return wrapper
+
+
+def label(f):
+    """Label of a function: model class for bound methods, qualified name otherwise"""
+    owner = getattr(f, '__self__', None)
+    if owner is not None:
+        return _class_label(owner)
+    return '%s.%s' % (getattr(f, '__module__', None),
+        getattr(f, '__qualname__', type(f).__name__))
+
+
+def _class_label(obj):
+    cls = type(obj)
+    return '%s.%s' % (cls.__module__, cls.__qualname__)
+
+
+timer = time.perf_counter
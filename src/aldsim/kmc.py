@@ -0,0 +1,133 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Lattice kinetic Monte Carlo of self-limited surface reactions
+
+The surface is a periodic square lattice of reaction sites. Each site
+reacts with the precursor at the rate given by the mean-field kinetics
+of its class, 1/t0 for ALDideal and 1/t1 or 1/t2 for the two pathways
+of ALDsoft, whose sites are assigned at random with the fractions f1
+and f2. Once a site reacts, the ligands of the adsorbed precursor can
+block the sites within its footprint, which then can no longer react.
+Without blocking, the lattice reproduces the mean-field saturation
+curves.
+
+Many independent replicas are advanced at once, stored as a single
+(replicas, L, L) array. Time advances in synchronous steps: every free
+site reacts within a step with probability 1-exp(-dt/t0), which is
+exact in the absence of blocking. Conflicts between neighbouring sites
+reacting in the same step are resolved by random priorities: a site
+only reacts if its priority is higher than those of all the other
+candidates within its footprint, and the rest try again in the
+following steps unless they become blocked.
+
+"""
+
+import numpy as np
+
+from .chem import ALDideal, ALDsoft
+from .result import SimulationResult
+
+
+_footprints = {
+    None : (),
+    'nn' : ((1, 0), (-1, 0), (0, 1), (0, -1)),
+    'nnn' : ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)),
+}
+
+
+class LatticeKMC:
+    """Kinetic Monte Carlo of a precursor dose on a lattice of sites
+
+    Args:
+        chem : ALDideal or ALDsoft surface kinetics
+        L (int, optional) : number of sites along each side of the lattice
+        replicas (int, optional) : number of independent replicas
+        footprint (optional) : sites blocked by a reacted site. None
+            for no blocking, 'nn' for its nearest neighbours, 'nnn' for
+            its nearest and next nearest neighbours, or a sequence of
+            (dx, dy) offsets.
+        seed (optional) : seed of the random number generator
+
+    """
+
+    def __init__(self, chem, L=100, replicas=16, footprint=None, seed=None):
+        if not isinstance(chem, (ALDideal, ALDsoft)):
+            raise ValueError("Unsupported surface kinetics %s" % type(chem).__name__)
+        self.chem = chem
+        self.L = L
+        self.replicas = replicas
+        if isinstance(footprint, str) or footprint is None:
+            footprint = _footprints[footprint]
+        self.footprint = tuple(tuple(offset) for offset in footprint)
+        self.rng = np.random.default_rng(seed)
+
+    def _times(self, T, p):
+        """Characteristic times and fractions of the site classes"""
+        if isinstance(self.chem, ALDideal):
+            return np.array([self.chem.t0(T, p)]), np.array([1.0])
+        f = np.array([self.chem.f1, self.chem.f2])
+        return np.array(self.chem.t0(T, p)), f/np.sum(f)
+
+    def run(self, T, p, t, substeps=1):
+        """Simulates a dose at constant temperature and pressure
+
+        Args:
+            T (float) : temperature in K
+            p (float) : precursor pressure in Pa
+            t (ndarray) : increasing, uniformly spaced times, in
+                seconds, starting at zero
+            substeps (int, optional) : synchronous steps between
+                consecutive times, which reduce the number of conflicts
+
+        Returns:
+            A SimulationResult with the time and the fraction of sites
+            that have reacted (coverage) or are blocked (blocked) in
+            each replica
+
+        """
+        t = np.asarray(t, dtype=float)
+        t0, frac = self._times(T, p)
+        dt = (t[1]-t[0])/substeps if t.size > 1 else 0
+        prob = -np.expm1(-dt/t0)
+        shape = (self.replicas, self.L, self.L)
+        u = self.rng.random(shape, dtype=np.float32)
+        cls = np.searchsorted(np.cumsum(frac)[:-1], u, side='right')
+        psite = prob[cls].astype(np.float32)
+        reacted = np.zeros(shape, dtype=bool)
+        blocked = np.zeros(shape, dtype=bool)
+        data = np.zeros((2, self.replicas, t.size))
+        for n in range(1, t.size):
+            for _ in range(substeps):
+                free = ~(reacted | blocked)
+                new = free & (self.rng.random(shape, dtype=np.float32) < psite)
+                if self.footprint:
+                    new = self._resolve(new)
+                    reacted |= new
+                    for offset in self.footprint:
+                        blocked |= np.roll(new, offset, axis=(1, 2))
+                    blocked &= ~reacted
+                else:
+                    reacted |= new
+            data[0,:,n] = np.mean(reacted, axis=(1, 2))
+            data[1,:,n] = np.mean(blocked, axis=(1, 2))
+        return SimulationResult(t, ('coverage', 'blocked'), data)
+
+    def _resolve(self, new):
+        """Keeps the candidates with the highest priority within their footprint"""
+        prio = np.where(new, self.rng.random(new.shape, dtype=np.float32), -1)
+        win = new.copy()
+        for dx, dy in self.footprint:
+            win &= prio > np.roll(prio, (dx, dy), axis=(1, 2))
+            win &= prio > np.roll(prio, (-dx, -dy), axis=(1, 2))
+        return win
+
+    def saturation_curve(self, T, p, substeps=1):
+        """Return the saturation curve as a (time, coverage) tuple
+
+        The times are those of the mean-field saturation curve of the
+        surface kinetics, and the coverage is averaged over replicas.
+
+        """
+        t, _ = self.chem.saturation_curve(T, p)
+        out = self.run(T, p, t, substeps)
+        return out.time, np.mean(out.coverage, axis=0)
@@ -1,2 +1,3 @@
 from .zerod import ZeroD
 from .batch import WellStirred, ParticlePlugFlow
+from .base import RecipeOutput
@@ -1,3 +1,19 @@
+from collections import namedtuple
+
+
+RecipeOutput = namedtuple('RecipeOutput', ['Da', 't0', 'time', 'precursor'])
+RecipeOutput.__doc__ = """Columnar output of the evaluation of dose recipes
+
+    Args:
+        Da (ndarray) : Damkohler number. It is NaN for the ZeroD model.
+        t0 (ndarray) : characteristic time, in seconds
+        time (ndarray) : dose time, in seconds, required to reach the
+            target coverage
+        precursor (ndarray) : precursor utilization at that dose time.
+            It is NaN for the ZeroD model.
+
+"""
+
 
 class IdealDoseModel:
 
@@ -3,32 +3,30 @@
 """Batch particle coating ALD models"""
 
 import numpy as np
-from scipy.integrate import solve_ivp
 
-from .base import IdealDoseModel
+from .base import IdealDoseModel, RecipeOutput
 from aldsim.constants import kb
+from aldsim.solvers import ode_solver
+from aldsim.result import SimulationResult
+from aldsim.core.ideal.particle.batch import wellmixed, plugflow
+from aldsim.core.ideal.particle.batch import WellMixed, PlugFlowMixed
+from aldsim.core.ideal.particle import psd
+from aldsim.instrument import labelled
 
 class WellStirredND:
 
-    def __init__(self, Da):
+    def __init__(self, Da, method='analytic'):
         self.Da = Da
+        self.method = method
 
+    @labelled
     def calc_coverage(self, tau):
-        ep = 1
-        t = 0.5
-        Da = self.Da
-        damp = 0.1
-        while ep > 1e-6:
-            f_t = self._f_t(t, Da, tau)
-            fp_t = self._fp_t(t, Da, tau)
-            damp = 0.1
-            tn = 1.1
-            while tn > 1 or tn < 0:
-                damp = 0.5*damp
-                tn = t - damp*f_t/fp_t
-            ep = abs(t-tn)/t
-            t = tn
-        return t
+        return wellmixed.calc_coverage(self.Da, tau)
+
+    @labelled
+    def time_to_coverage(self, theta):
+        theta = np.asarray(theta, dtype=float)
+        return wellmixed.calc_time(self.Da, theta), 1/(1+self.Da*(1-theta))
     
     def _f_t(self, theta, Da, tau):
         return theta - np.log(1-theta)/Da - tau
@@ -39,12 +37,20 @@ class WellStirredND:
     def _f(self, t, y):
         return -y/(1/self.Da+y)
 
-    def run(self, tmax=5, dt=0.01):
-        out = solve_ivp(self._f, [0,tmax], [1], method='LSODA',
-                t_eval=np.arange(0,tmax,dt))
-        cov = 1-out.y[0,:]
-        x = 1/(1+self.Da*out.y[0,:])
-        return out.t, cov, x
+    def run(self, tmax=5, dt=0.01, dtype=None):
+        if self.method == 'analytic':
+            t = np.arange(0, tmax, dt)
+            y = wellmixed.calc_unreacted(self.Da, t)
+        elif self.method == 'ode':
+            out = ode_solver(self._f, [1], tmax, np.arange(0,tmax,dt))
+            t = out.t
+            y = out.y[0,:]
+        else:
+            raise ValueError("Unknown method %s" % self.method)
+        out = np.empty((2,) + y.shape, dtype=dtype)
+        np.subtract(1, y, out=out[0])
+        np.divide(1, 1+self.Da*y, out=out[1])
+        return SimulationResult(t, ('coverage', 'precursor'), out)
 
     def saturation_curve(self, tmax=5, dt=0.01):
         t, cov, _ = self.run(tmax, dt)
@@ -65,33 +71,111 @@ class WellStirredND:
 
 class WellStirred(IdealDoseModel):
 
-    def __init__(self, chem, p, p0, T, S, flow):
+    def __init__(self, chem, p, p0, T, S, flow, method='analytic'):
         super().__init__(chem, p, T)
         self.S = S
         self.p0 = p0
         self.flow0 = flow
         da = self.Da()
-        self.base_model = WellStirredND(da)
+        self.base_model = WellStirredND(da, method)
+
+    @classmethod
+    def evaluate_recipes(cls, chem, p, p0, T, S, flow, theta=0.99):
+        """Evaluates a table of recipes in a single vectorized pass
+
+        The recipe parameters are broadcast against each other, so
+        that each one can be a column of a recipe table.
+
+        Args:
+            chem : ALDideal surface kinetics
+            p (float or ndarray) : precursor pressure, in Pa
+            p0 (float or ndarray) : reactor pressure, in Pa
+            T (float or ndarray) : temperature, in K
+            S (float or ndarray) : surface area of the particles, in m2
+            flow (float or ndarray) : carrier gas flow, in sccm
+            theta (float or ndarray, optional) : target coverage
+
+        Returns:
+            A RecipeOutput namedtuple of arrays
+
+        """
+        Da = calc_Da(chem, p0, T, S, flow)
+        t0 = calc_t0(chem, p, p0, T, S, flow)
+        theta = np.asarray(theta, dtype=float)
+        t, x = wellmixed.calc_time(Da, theta), 1/(1+Da*(1-theta))
+        return RecipeOutput(*np.broadcast_arrays(Da, t0, t*t0, x))
 
     def flow(self):
-        return (1e-6*self.flow0/60)*1e5/self.p0*(self.T/300)
+        return calc_flow(self.p0, self.T, self.flow0)
 
     def Da(self):
-        flow = self.flow()
-        return 0.25*self.S/flow*self.chem.beta()*self.vth
+        return calc_Da(self.chem, self.p0, self.T, self.S, self.flow0)
 
     def t0(self):
-        return kb*self.T*self.S/(self.flow()*self.site_area*self.p)
+        return calc_t0(self.chem, self.p, self.p0, self.T, self.S, self.flow0)
 
     def saturation_curve(self):
-        self.base_model.Da = self.Da()
-        t, cov = self.base_model.saturation_curve()
-        return t*self.t0(), cov
+        out = self.run()
+        return out.time, out.coverage
     
-    def run(self):
+    def run(self, dtype=None):
+        """Runs the dose simulation, with times in seconds
+
+        Args:
+            dtype (optional): data type of the stored curves
+
+        """
+        self.base_model.Da = self.Da()
+        return self.base_model.run(dtype=dtype).rescale(self.t0())
+
+    @labelled
+    def calc_coverage(self, t, av=1):
+        """Fraction of the available sites reacting during a dose
+
+        Args:
+            t (float or ndarray): dose time, in seconds
+            av (float or ndarray, optional): fraction of the sites
+                available at the start of the dose. The dose is then
+                equivalent to one on a fully available surface with
+                Damkohler number Da*av and characteristic time t0*av.
+
+        Returns:
+            Fraction of the available sites that have reacted
+
+        """
+        av = np.asarray(av, dtype=float)
+        avs = np.where(av > 0, av, 1)
+        theta = wellmixed.calc_coverage(self.Da()*avs, np.asarray(t)/(self.t0()*avs))
+        return np.where(av > 0, theta, 0)[()]
+
+    def average_psd(self, t, dist):
+        """Coverage and precursor averaged over a particle surface area distribution
+
+        The size classes share the gas phase, so that the result only
+        depends on the total surface area of the particles.
+
+        Args:
+            t (float or ndarray): dose time, in seconds
+            dist: psd.LogNormal or psd.Histogram distribution of the
+                surface area relative to its mean
+
+        Returns:
+            A tuple of surface coverage, precursor utilization
+
+        """
+        return psd.average(WellMixed, np.asarray(t)/self.t0(), self.Da(), dist)
+
+    @labelled
+    def time_to_coverage(self, theta):
+        """Dose time, in seconds, required to reach a given coverage
+
+        Returns:
+            A tuple of dose time, precursor utilization
+
+        """
         self.base_model.Da = self.Da()
-        t, cov, x = self.base_model.run()
-        return t*self.t0(), cov, x
+        t, x = self.base_model.time_to_coverage(theta)
+        return t*self.t0(), x
 
 
 
@@ -105,25 +189,109 @@ class ParticlePlugFlow(IdealDoseModel):
         da = self.Da()
         self.base_model = PlugFlowMixedND(da)
 
+    @classmethod
+    def evaluate_recipes(cls, chem, p, p0, T, S, flow, theta=0.99):
+        """Evaluates a table of recipes, as WellStirred.evaluate_recipes"""
+        Da = calc_Da(chem, p0, T, S, flow)
+        t0 = calc_t0(chem, p, p0, T, S, flow)
+        theta = np.asarray(theta, dtype=float)
+        t, x = plugflow.calc_time(Da, theta), np.exp(-Da*(1-theta))
+        return RecipeOutput(*np.broadcast_arrays(Da, t0, t*t0, x))
+
     def flow(self):
-        return (1e-6*self.flow0/60)*1e5/self.p0*(self.T/300)
+        return calc_flow(self.p0, self.T, self.flow0)
 
     def Da(self):
-        flow = self.flow()
-        return 0.25*self.S/flow*self.chem.beta()*self.vth
+        return calc_Da(self.chem, self.p0, self.T, self.S, self.flow0)
 
     def t0(self):
-        return kb*self.T*self.S/(self.flow()*self.site_area*self.p)
+        return calc_t0(self.chem, self.p, self.p0, self.T, self.S, self.flow0)
 
     def saturation_curve(self):
+        out = self.run()
+        return out.time, out.coverage
+
+    def run(self, dtype=None):
+        """Runs the dose simulation, with times in seconds
+
+        Args:
+            dtype (optional): data type of the stored curves
+
+        """
         self.base_model.Da = self.Da()
-        t, cov = self.base_model.saturation_curve()
-        return t*self.t0(), cov
+        return self.base_model.run(dtype=dtype).rescale(self.t0())
 
-    def run(self):
+    @labelled
+    def calc_coverage(self, t, av=1):
+        """Fraction of the available sites reacting during a dose
+
+        Args:
+            t (float or ndarray): dose time, in seconds
+            av (float or ndarray, optional): fraction of the sites
+                available at the start of the dose. The dose is then
+                equivalent to one on a fully available surface with
+                Damkohler number Da*av and characteristic time t0*av.
+
+        Returns:
+            Fraction of the available sites that have reacted
+
+        """
+        av = np.asarray(av, dtype=float)
+        avs = np.where(av > 0, av, 1)
+        theta = plugflow.calc_coverage(self.Da()*avs, np.asarray(t)/(self.t0()*avs))
+        return np.where(av > 0, theta, 0)[()]
+
+    def average_psd(self, t, dist):
+        """Coverage and precursor averaged over a particle surface area distribution
+
+        The size classes share the gas phase, so that the result only
+        depends on the total surface area of the particles.
+
+        Args:
+            t (float or ndarray): dose time, in seconds
+            dist: psd.LogNormal or psd.Histogram distribution of the
+                surface area relative to its mean
+
+        Returns:
+            A tuple of surface coverage, precursor utilization
+
+        """
+        return psd.average(PlugFlowMixed, np.asarray(t)/self.t0(), self.Da(), dist)
+
+    @labelled
+    def time_to_coverage(self, theta):
+        """Dose time, in seconds, required to reach a given coverage
+
+        Returns:
+            A tuple of dose time, precursor utilization
+
+        """
         self.base_model.Da = self.Da()
-        t, cov, x = self.base_model.run()
-        return t*self.t0(), cov, x
+        t, x = self.base_model.time_to_coverage(theta)
+        return t*self.t0(), x
+
+
+def calc_flow(p0, T, flow):
+    """Volumetric flow rate, in m3/s, of a carrier flow in sccm"""
+    return (1e-6*np.asarray(flow)/60)*1e5/p0*(np.asarray(T)/300)
+
+
+def calc_Da(chem, p0, T, S, flow):
+    """Damkohler number of the particle dose models
+
+    All the recipe parameters are broadcast against each other.
+
+    """
+    return 0.25*S/calc_flow(p0, T, flow)*chem.beta()*chem.vth(T)
+
+
+def calc_t0(chem, p, p0, T, S, flow):
+    """Characteristic time, in seconds, of the particle dose models
+
+    All the recipe parameters are broadcast against each other.
+
+    """
+    return kb*T*S/(calc_flow(p0, T, flow)*chem.site_area*p)
 
 
 class PlugFlowMixedND:
@@ -131,22 +299,26 @@ class PlugFlowMixedND:
     def __init__(self, Da):
         self.Da = Da
 
+    @labelled
     def calc_coverage(self, t):
-        Da = self.Da
-        return 1 - 1/Da*np.log(1+(np.exp(Da)-1)*np.exp(-Da*t))
+        return plugflow.calc_coverage(self.Da, t)
+
+    @labelled
+    def time_to_coverage(self, theta):
+        theta = np.asarray(theta, dtype=float)
+        return plugflow.calc_time(self.Da, theta), np.exp(-self.Da*(1-theta))
     
     def saturation_curve(self, tmax=5, dt= 0.01):
         t = np.arange(0, tmax, dt)
-        Da = self.Da
-        c = 1 - 1/Da*np.log(1+(np.exp(Da)-1)*np.exp(-Da*t))
-        return t, c
+        return t, 1 - plugflow.calc_unreacted(self.Da, t)
     
-    def run(self, tmax=5, dt=0.01):
+    def run(self, tmax=5, dt=0.01, dtype=None):
         t = np.arange(0, tmax, dt)
         Da = self.Da
-        y = 1/Da*np.log(1+(np.exp(Da)-1)*np.exp(-Da*t))
-        c = 1-y
-        x = np.exp(-Da*y)
-        return t, c, x
+        y = plugflow.calc_unreacted(Da, t)
+        out = np.empty((2,) + y.shape, dtype=dtype)
+        np.subtract(1, y, out=out[0])
+        np.exp(-Da*y, out=out[1])
+        return SimulationResult(t, ('coverage', 'precursor'), out)
 
 
@@ -1,19 +1,68 @@
 from ...constants import kb
-from .base import IdealDoseModel
+from .base import IdealDoseModel, RecipeOutput
 
 import numpy as np
 
 class ZeroD(IdealDoseModel):
 
     def __init__(self, chem, **kwargs):
-        super().__init__(chem, kwargs['T'], kwargs['p'])
+        super().__init__(chem, kwargs['p'], kwargs['T'])
+
+    @classmethod
+    def evaluate_recipes(cls, chem, p, T, theta=0.99):
+        """Evaluates a table of recipes in a single vectorized pass
+
+        Args:
+            chem : ALDideal surface kinetics
+            p (float or ndarray) : precursor pressure, in Pa
+            T (float or ndarray) : temperature, in K
+            theta (float or ndarray, optional) : target coverage
+
+        Returns:
+            A RecipeOutput namedtuple of arrays, with NaN Damkohler
+            numbers and precursor utilization
+
+        """
+        t0 = calc_t0(chem, p, T)
+        t = -t0*np.log1p(-np.asarray(theta, dtype=float))
+        t0, t = np.broadcast_arrays(t0, t)
+        nan = np.full(t.shape, np.nan)
+        return RecipeOutput(nan, t0, t, nan)
+
+    def t0(self):
+        """Characteristic time for saturation"""
+        return calc_t0(self.chem, self.p, self.T)
+
+    def calc_coverage(self, t, av=1):
+        """Fraction of the available sites reacting during a dose
+
+        Under a constant flux, the fraction of the available sites that
+        react does not depend on the fraction av of sites available at
+        the start of the dose.
+
+        Args:
+            t (float or ndarray): dose time, in seconds
+            av (float or ndarray, optional): fraction of available sites
+
+        Returns:
+            Fraction of the available sites that have reacted
+
+        """
+        return (-np.expm1(-np.asarray(t)/self.t0()) + 0*np.asarray(av))[()]
 
     def saturation_curve(self):
-        print(kb)
-        nu = 0.25*self.chem.site_area*self.vth*self.p/(kb*self.T)*self.chem.beta0
-        t0 = 1/nu
+        t0 = self.t0()
         dt = 0.01*t0
         t_arr = np.arange(0, 5*t0, dt)
         cov_arr = 1-np.exp(-t_arr/t0)
         return t_arr, cov_arr
 
+
+def calc_t0(chem, p, T):
+    """Characteristic time, in seconds, under a constant precursor flux
+
+    The pressure and temperature are broadcast against each other.
+
+    """
+    nu = 0.25*chem.site_area*chem.vth(T)*p/(kb*np.asarray(T))*chem.beta0
+    return 1/nu
@@ -0,0 +1,151 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Parallel evaluation of parameter sets
+
+Batched model evaluations broadcast their parameters against each
+other. map_chunks flattens the resulting parameter sets, splits them
+into contiguous chunks, evaluates each chunk on an executor and merges
+the results back in order.
+
+The ODE-based models evaluate all the parameter sets of a chunk in a
+single solver call, whose right hand side is a Python function. They
+hold the GIL most of the time, so they only scale with a process pool.
+The functions and models sent to a process pool have to be picklable:
+module-level functions, functools.partial objects and model instances
+are.
+
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+
+class Executor:
+    """Pool of workers evaluating chunks of parameter sets
+
+    The pool is created on first use and kept until shutdown is called,
+    so that it can be reused across evaluations. It can also be used
+    as a context manager.
+
+    Args:
+        kind (str, optional) : 'serial', 'thread' or 'process'
+        workers (int, optional) : number of workers. Defaults to the
+            number of CPUs.
+        chunks_per_worker (int, optional) : number of chunks per worker,
+            which balances the load when the cost of the parameter sets
+            is uneven.
+
+    """
+
+    _pools = {
+        'thread' : ThreadPoolExecutor,
+        'process' : ProcessPoolExecutor,
+    }
+
+    def __init__(self, kind='process', workers=None, chunks_per_worker=4):
+        if kind != 'serial' and kind not in self._pools:
+            raise ValueError("Unknown executor kind %s" % kind)
+        self.kind = kind
+        self.workers = 1 if kind == 'serial' else (workers or os.cpu_count() or 1)
+        self.chunks_per_worker = chunks_per_worker
+        self._pool = None
+
+    def map(self, fn, chunks):
+        """Applies fn to each chunk, returning the results in order"""
+        chunks = list(chunks)
+        if self.kind == 'serial' or len(chunks) <= 1:
+            return [fn(*chunk) for chunk in chunks]
+        if self._pool is None:
+            self._pool = self._pools[self.kind](max_workers=self.workers)
+        return list(self._pool.map(fn, *zip(*chunks)))
+
+    def nchunks(self, size):
+        return max(1, min(size, self.workers*self.chunks_per_worker))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def get_executor(executor):
+    """Returns an Executor and whether it has to be shut down after use
+
+    Args:
+        executor : None for serial evaluation, an Executor, or the kind
+            of executor to create with the default settings
+
+    """
+    if executor is None:
+        return Executor('serial'), False
+    if isinstance(executor, Executor):
+        return executor, False
+    return Executor(executor), True
+
+
+def map_chunks(fn, params, executor=None, args=()):
+    """Evaluates fn over chunks of broadcast parameter sets
+
+    The parameters are broadcast against each other and flattened.
+    fn is called as fn(*args, **chunk), where each value of chunk is a
+    1D array of parameters, and must return an array or a tuple of
+    arrays whose first axis runs over the parameter sets of the chunk.
+
+    Args:
+        fn (callable) : function evaluating a chunk of parameter sets
+        params (dict) : parameters. None values are passed through.
+        executor (optional) : None, an Executor, or 'serial', 'thread'
+            or 'process'
+        args (tuple, optional) : positional arguments of fn
+
+    Returns:
+        The output of fn, with its first axis replaced by the
+        broadcast shape of the parameters
+
+    """
+    names = [name for name, value in params.items() if value is not None]
+    values = np.broadcast_arrays(*[np.asarray(params[name], dtype=float)
+        for name in names])
+    shape = values[0].shape if values else ()
+    flat = [np.ravel(v) for v in values]
+    size = flat[0].size if flat else 1
+    pool, owned = get_executor(executor)
+    try:
+        splits = np.array_split(np.arange(size), pool.nchunks(size))
+        chunks = [tuple(v[idx] for v in flat) for idx in splits if idx.size > 0]
+        results = pool.map(_Chunk(fn, args, names, params), chunks)
+    finally:
+        if owned:
+            pool.shutdown()
+    if isinstance(results[0], tuple):
+        return tuple(_merge([r[i] for r in results], shape)
+            for i in range(len(results[0])))
+    return _merge(results, shape)
+
+
+class _Chunk:
+    """Picklable call of fn over a chunk of parameter sets"""
+
+    def __init__(self, fn, args, names, params):
+        self.fn = fn
+        self.args = args
+        self.names = names
+        self.fixed = {name: value for name, value in params.items() if value is None}
+
+    def __call__(self, *values):
+        kwargs = dict(self.fixed)
+        kwargs.update(zip(self.names, values))
+        return self.fn(*self.args, **kwargs)
+
+
+def _merge(arrays, shape):
+    out = np.concatenate([np.asarray(a) for a in arrays], axis=0)
+    return out.reshape(shape + out.shape[1:])
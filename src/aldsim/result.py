@@ -0,0 +1,125 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Container for the output of the model simulations
+
+The curves of a simulation are stored in a single contiguous array
+with the channel as its first axis, followed by the broadcast shape of
+the model parameters and the time axis. The time is kept normalized
+and shared by all the channels, and the time scale of the dose models
+is only applied when the time is accessed.
+
+Iterating over a SimulationResult yields the time followed by each
+channel, so that it can be unpacked like the tuples returned by the
+models:
+
+    t, cov, x = model.run()
+
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+class SimulationResult:
+    """Time and curves of a simulation
+
+    Args:
+        t (ndarray) : normalized time
+        names (tuple) : names of the channels
+        data (ndarray) : curves, with the channel as first axis and
+            the time as last axis
+        tscale (float, optional) : time scale, applied to t the first
+            time that the time is accessed
+        dtype (optional) : data type of the stored curves. float32
+            halves the memory of large simulations.
+
+    """
+
+    __slots__ = ('t', 'names', 'data', '_tscale', '_time')
+
+    def __init__(self, t, names, data, tscale=1, dtype=None):
+        self.t = np.asarray(t)
+        self.names = tuple(names)
+        self.data = np.require(data, dtype=dtype, requirements='C')
+        self._tscale = tscale
+        self._time = None
+        if self.data.shape[0] != len(self.names):
+            raise ValueError("Expected %d channels, got %d" % (len(self.names),
+                self.data.shape[0]))
+
+    @property
+    def tscale(self):
+        return self._tscale
+
+    @property
+    def time(self):
+        """Time in the units of the time scale"""
+        if self._time is None:
+            self._time = self.t if self._tscale == 1 else self.t*self._tscale
+        return self._time
+
+    @property
+    def shape(self):
+        """Shape of each channel"""
+        return self.data.shape[1:]
+
+    def rescale(self, tscale):
+        """Returns a result sharing the same data with its time scaled by tscale"""
+        return type(self)(self.t, self.names, self.data, self.tscale*tscale)
+
+    def astype(self, dtype):
+        """Returns a copy of the result with the curves stored as dtype"""
+        return type(self)(self.t, self.names, self.data.astype(dtype), self.tscale)
+
+    def __getattr__(self, name):
+        if name in SimulationResult.__slots__:
+            raise AttributeError(name)
+        try:
+            return self.data[self.names.index(name)]
+        except ValueError:
+            raise AttributeError("%s has no channel %s" % (type(self).__name__,
+                name)) from None
+
+    def __getitem__(self, key):
+        """Time for 0 or the channel name 't', channels for other indices or names"""
+        if isinstance(key, str):
+            return self.time if key == 't' else getattr(self, key)
+        return tuple(self)[key]
+
+    def __len__(self):
+        return 1 + len(self.names)
+
+    def __iter__(self):
+        yield self.time
+        yield from self.data
+
+    def __repr__(self):
+        return "%s(names=%s, shape=%s, dtype=%s)" % (type(self).__name__,
+            self.names, self.shape, self.data.dtype)
+
+    def save(self, path):
+        """Saves the result as path.npy, holding the curves, and path.json
+
+        The curves can then be loaded as a memory map.
+
+        """
+        path = os.fspath(path)
+        if path.endswith('.npy'):
+            path = path[:-4]
+        np.save(path + '.npy', self.data)
+        with open(path + '.json', 'w') as f:
+            json.dump({'names': self.names, 't': self.t.tolist(),
+                'tscale': float(self.tscale)}, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Loads a result saved with save, memory-mapping the curves by default"""
+        path = os.fspath(path)
+        if path.endswith('.npy'):
+            path = path[:-4]
+        with open(path + '.json') as f:
+            meta = json.load(f)
+        data = np.load(path + '.npy', mmap_mode=mmap_mode)
+        return cls(np.asarray(meta['t']), meta['names'], data, meta['tscale'])
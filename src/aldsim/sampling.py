@@ -0,0 +1,62 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Adaptive sampling of saturation curves"""
+
+import numpy as np
+
+
+def adaptive_sampling(f, a, b, tol=1e-3, n0=17, max_points=100000):
+    """Samples a function with an error-controlled set of points
+
+    Starts from n0 uniformly spaced points and bisects every interval
+    in which the value of the function at the midpoint differs from the
+    linear interpolation between its ends by more than tol. All the
+    midpoints of each refinement level are evaluated in a single call.
+
+    Args:
+        f (callable): function of a 1D array returning either an array of
+            the same shape or a (k, n) array with k channels. The error
+            is controlled for every channel.
+        a (float): lower end of the interval
+        b (float): upper end of the interval
+        tol (float, optional): absolute interpolation tolerance
+        n0 (int, optional): number of points of the initial grid
+        max_points (int, optional): largest number of points
+
+    Returns:
+        A tuple of point, function value arrays
+
+    """
+    x = np.linspace(a, b, n0)
+    y = f(x)
+    squeeze = np.ndim(y) == 1
+    y = np.atleast_2d(y)
+    active = np.ones(n0-1, dtype=bool)
+    hmin = 1e-12*abs(b-a)
+    while np.any(active):
+        i = np.nonzero(active)[0]
+        xm = 0.5*(x[i]+x[i+1])
+        ym = np.atleast_2d(f(xm))
+        err = np.max(np.abs(ym - 0.5*(y[:,i]+y[:,i+1])), axis=0)
+        split = (err > tol) & (x[i+1]-x[i] > hmin)
+        if x.size + np.count_nonzero(split) > max_points:
+            break
+        x = np.insert(x, i[split]+1, xm[split])
+        y = np.insert(y, i[split]+1, ym[:,split], axis=1)
+        refine = np.zeros(active.size, dtype=bool)
+        refine[i[split]] = True
+        active = np.repeat(refine, 1+refine)
+    return x, (y[0] if squeeze else y)
+
+
+def sample_curve(f, tmax, dt, tol=None):
+    """Evaluates a curve either on a fixed grid or adaptively
+
+    If tol is None, f is evaluated at np.arange(0, tmax, dt). Otherwise,
+    the interval [0, tmax] is sampled adaptively with tolerance tol.
+
+    """
+    if tol is None:
+        t = np.arange(0, tmax, dt)
+        return t, f(t)
+    return adaptive_sampling(f, 0, tmax, tol)
@@ -1,18 +1,154 @@
 #Copyright © 2024-2025, UChicago Argonne, LLC
 
-from scipy.integrate import solve_ivp
+from collections import OrderedDict
 
-def ode_solver(fdot, initial, tmax, t_eval):
+import numpy as np
+
+from . import instrument as _instrument
+
+def ode_solver(fdot, initial, tmax, t_eval, jac=None, band=None,
+        dense_output=False, rtol=None, atol=None):
     """
     Wrapper for ODE solver from scipy.integrate
+
+    If provided, band is a (lower, upper) tuple with the bandwidth of
+    the Jacobian, and jac must return it in LSODA's packed format.
+    rtol and atol override the default tolerances of the solver.
+
+    scipy.integrate is only imported on the first call.
+    """
+    from scipy.integrate import solve_ivp
+    kwargs = {}
+    if jac is not None:
+        kwargs['jac'] = jac
+    if band is not None:
+        kwargs['lband'], kwargs['uband'] = band
+    if rtol is not None:
+        kwargs['rtol'] = rtol
+    if atol is not None:
+        kwargs['atol'] = atol
+    if _instrument.is_active():
+        return _recorded_ode_solver(fdot, initial, tmax, t_eval, dense_output,
+            kwargs)
+    return solve_ivp(fdot, [0,tmax], initial, t_eval=t_eval, method='LSODA',
+        dense_output=dense_output, **kwargs)
+
+
+def _recorded_ode_solver(fdot, initial, tmax, t_eval, dense_output, kwargs):
+    """Runs ode_solver recording its counters
+
+    The right hand side and the Jacobian are wrapped to count their
+    evaluations. The dense output is always requested, since its
+    breakpoints are the only record of the accepted steps.
+
     """
-    return solve_ivp(fdot, [0,tmax], initial, t_eval=t_eval, method='LSODA')
+    from scipy.integrate import solve_ivp
+    count = {'fev': 0, 'jev': 0}
+    def f(t, y):
+        count['fev'] += 1
+        return fdot(t, y)
+    if 'jac' in kwargs:
+        jac = kwargs['jac']
+        def j(t, y):
+            count['jev'] += 1
+            return jac(t, y)
+        kwargs = dict(kwargs, jac=j)
+    t0 = _instrument.timer()
+    out = solve_ivp(f, [0,tmax], initial, t_eval=t_eval, method='LSODA',
+        dense_output=True, **kwargs)
+    wall_time = _instrument.timer() - t0
+    steps = len(out.sol.ts)-1 if out.sol is not None else 0
+    if not dense_output:
+        out.sol = None
+    _instrument.add_call('ode', fdot, nfev=count['fev'],
+        njev=max(count['jev'], int(out.njev)), nlu=int(out.nlu), steps=steps,
+        rejected=None, size=len(initial), wall_time=wall_time)
+    return out
+
+
+class SolutionCache:
+    """
+    Bounded LRU cache of dense ODE solutions
+
+    Solutions are stored together with the largest time they cover.
+    A query for a longer time counts as a miss and replaces the
+    stored solution.
+
+    Args:
+        maxsize (int, optional): maximum number of stored solutions
+
+    """
+
+    def __init__(self, maxsize=128):
+        self._data = OrderedDict()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value):
+        self._maxsize = value
+        self._evict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, tmax, solve):
+        """
+        Returns a dense solution valid in [0, tmax]
+
+        Args:
+            key (tuple): hashable key, usually the model parameters
+            tmax (float): largest time required
+            solve (callable): function solve(tmax) returning a dense
+                solution. It is only called on a cache miss.
+
+        """
+        entry = self._data.get(key)
+        if entry is not None and entry[0] >= tmax:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[1]
+        self.misses += 1
+        sol = solve(tmax)
+        self._data[key] = (tmax, sol)
+        self._data.move_to_end(key)
+        self._evict()
+        return sol
+
+    def clear(self):
+        """Removes all the solutions and resets the counters"""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def info(self):
+        """Returns the cache statistics as a dictionary"""
+        return {'hits': self.hits, 'misses': self.misses,
+            'evictions': self.evictions, 'size': len(self._data),
+            'maxsize': self._maxsize}
+
+    def _evict(self):
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
 
 
 def boundedNewton_solver(f, fdot):
     """
     Solves a nonlinear equation bounded between 0 and 1
     """
+    recording = _instrument.is_active()
+    if recording:
+        t0 = _instrument.timer()
+        nit = 0
+        halvings = 0
     ep = 1
     t = 0.5
     damp = 0.1
@@ -24,6 +160,87 @@ def boundedNewton_solver(f, fdot):
         while tn > 1 or tn < 0:
             damp = 0.5*damp
             tn = t - damp*f_t/fp_t
+            if recording:
+                halvings += 1
         ep = abs(t-tn)/t
         t = tn
-    return t
\ No newline at end of file
+        if recording:
+            nit += 1
+    if recording:
+        _instrument.add_call('boundedNewton', f, iterations=nit, nfev=nit,
+            halvings=halvings, wall_time=_instrument.timer()-t0)
+    return t
+
+def bracketedNewton_solver(f, fdot, a, b, x0=None, args=(), xtol=1e-12,
+        rtol=1e-10, maxiter=100, full_output=False):
+    """
+    Vectorized Newton solver safeguarded by bisection
+
+    Solves f(x, *args) = 0 elementwise for an increasing function f
+    with a root bracketed by [a, b]. All the inputs are broadcast
+    against each other, and each element is iterated only until it
+    converges. Newton steps falling outside the current bracket are
+    replaced by bisection, so convergence is guaranteed.
+
+    Args:
+        f (callable): function f(x, *args)
+        fdot (callable): derivative fdot(x, *args)
+        a (float or ndarray): lower end of the bracket
+        b (float or ndarray): upper end of the bracket
+        x0 (float or ndarray, optional): initial guess. Defaults to
+            the midpoint of the bracket.
+        args (tuple, optional): additional arguments passed to f and fdot
+        xtol (float, optional): absolute tolerance
+        rtol (float, optional): relative tolerance
+        maxiter (int, optional): maximum number of iterations
+        full_output (bool, optional): if True, also returns the mask
+            of converged elements
+
+    Returns:
+        The roots, with the broadcast shape of the inputs.
+
+    """
+    if x0 is None:
+        x0 = 0.5*(np.asarray(a, dtype=float)+np.asarray(b, dtype=float))
+    arrays = np.broadcast_arrays(x0, a, b, *args)
+    shape = arrays[0].shape
+    x, lo, hi = [np.array(v, dtype=float).ravel() for v in arrays[:3]]
+    params = [np.asarray(v).ravel() for v in arrays[3:]]
+    converged = np.zeros(x.shape, dtype=bool)
+    active = np.arange(x.size)
+    recording = _instrument.is_active()
+    if recording:
+        t0 = _instrument.timer()
+        nit = nfev = nbisect = 0
+    for _ in range(maxiter):
+        if active.size == 0:
+            break
+        if recording:
+            nit += 1
+            nfev += active.size
+        pa = [p[active] for p in params]
+        xa, la, ha = x[active], lo[active], hi[active]
+        f_x = f(xa, *pa)
+        la = np.where(f_x < 0, xa, la)
+        ha = np.where(f_x > 0, xa, ha)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            xn = xa - f_x/fdot(xa, *pa)
+        bisect = ~((xn > la) & (xn < ha))
+        xn[bisect] = 0.5*(la[bisect]+ha[bisect])
+        if recording:
+            nbisect += int(np.count_nonzero(bisect))
+        done = (f_x == 0) | (np.abs(xn-xa) <= xtol + rtol*np.abs(xn)) | \
+            (ha-la <= xtol + rtol*np.abs(xn))
+        xn[f_x == 0] = xa[f_x == 0]
+        x[active], lo[active], hi[active] = xn, la, ha
+        converged[active[done]] = True
+        active = active[~done]
+    if recording:
+        _instrument.add_call('bracketedNewton', f, iterations=nit, nfev=nfev,
+            bisections=nbisect, size=x.size,
+            converged=int(np.count_nonzero(converged)),
+            wall_time=_instrument.timer()-t0)
+    x = x.reshape(shape)
+    if full_output:
+        return x[()], converged.reshape(shape)[()]
+    return x[()]
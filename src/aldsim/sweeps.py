@@ -0,0 +1,272 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Parameter sweeps over the non-dimensional models"""
+
+import json
+import os
+
+import numpy as np
+
+from .core.ideal.particle.batch import PlugFlowMixed, WellMixed
+from .core.ideal.particle.batch import plugflow as _pfm
+from .core.ideal.particle.batch import wellmixed as _wm
+from .core.ideal.particle.continuous import PlugFlowSpatial, WellMixedSpatial
+from .core.ideal.particle.continuous import plugflow as _pfs
+from .core.softsat import batch as _softsat
+from .core.softsat.batch import wellstirred as _ssws
+from .parallel import map_chunks
+
+
+class SweepResult:
+    """Labeled output of a parameter sweep
+
+    Coverage and precursor arrays have one axis per swept parameter,
+    in the order given by dims, with the normalized time as the
+    last axis.
+
+    Args:
+        dims (tuple) : names of the axes
+        coords (dict) : values of the parameters along each axis
+        coverage (ndarray) : surface coverage
+        precursor (ndarray) : fraction of precursor leaving the reactor,
+            as returned by the run method of each model.
+
+    """
+
+    def __init__(self, dims, coords, coverage, precursor):
+        self.dims = dims
+        self.coords = coords
+        self.coverage = coverage
+        self.precursor = precursor
+
+    @property
+    def shape(self):
+        return self.coverage.shape
+
+    def __getitem__(self, name):
+        if name in ('coverage', 'precursor'):
+            return getattr(self, name)
+        return self.coords[name]
+
+
+def evaluate(model_cls, t, executor=None, **params):
+    """Evaluates a non-dimensional model for arrays of parameters
+
+    The model parameters are broadcast against each other, and the
+    model is evaluated at every time in t.
+
+    Args:
+        model_cls : one of the non-dimensional model classes
+        t (ndarray) : increasing sequence of normalized times
+        **params : model parameters (Da, or D1, D2, f1 and f2 for
+            the soft saturating models). For the latter, the ratio
+            a=D2/D1 can be provided instead of D2, and f2 defaults to 1-f1.
+        executor (optional) : None, an Executor from aldsim.parallel,
+            or 'thread' or 'process'. The parameter sets are split into
+            chunks evaluated in parallel.
+
+    Returns:
+        A tuple of surface coverage, precursor arrays with shape
+        broadcast(params) + t.shape
+
+    """
+    try:
+        evaluator = _evaluators[model_cls]
+    except KeyError:
+        raise ValueError("No evaluator for model %s" % model_cls.__name__)
+    t = np.asarray(t, dtype=float)
+    if executor is not None:
+        return map_chunks(evaluator, params, executor, args=(t,))
+    return evaluator(t, **params)
+
+
+def sweep(model_cls, t, executor=None, **params):
+    """Evaluates a non-dimensional model over a parameter grid
+
+    Each array-valued parameter becomes one axis of the grid, in
+    the order in which they are provided. Scalar parameters are
+    held constant.
+
+    Args:
+        model_cls : one of the non-dimensional model classes
+        t (ndarray) : increasing sequence of normalized times
+        executor (optional) : None, an Executor from aldsim.parallel,
+            or 'thread' or 'process'
+        **params : model parameters, either scalars or 1D arrays
+
+    Returns:
+        A SweepResult object
+
+    """
+    dims = [name for name, value in params.items() if np.ndim(value) > 0]
+    grid = {}
+    for name, value in params.items():
+        if name in dims:
+            shape = [1]*len(dims)
+            shape[dims.index(name)] = -1
+            grid[name] = np.asarray(value, dtype=float).reshape(shape)
+        else:
+            grid[name] = value
+    cov, prec = evaluate(model_cls, t, executor, **grid)
+    shape = tuple(np.size(params[name]) for name in dims) + np.shape(t)
+    coords = {name: np.asarray(params[name]) for name in dims}
+    coords['t'] = np.asarray(t)
+    return SweepResult(tuple(dims) + ('t',), coords,
+        np.broadcast_to(cov, shape), np.broadcast_to(prec, shape))
+
+
+def sweep_to_disk(model_cls, t, path, chunksize=100000, executor=None,
+        max_chunks=None, dtype='float64', **params):
+    """Evaluates a non-dimensional model over a parameter grid, out of core
+
+    The grid is defined as in sweep. It is flattened and evaluated in
+    chunks of chunksize points, which are written to the memory-mapped
+    files coverage.npy and precursor.npy in the directory path. After
+    each chunk, a manifest.json file records the number of completed
+    chunks, so that calling sweep_to_disk again with the same arguments
+    resumes an interrupted sweep. The memory used only depends on the
+    chunk size.
+
+    Args:
+        model_cls : one of the non-dimensional model classes
+        t (ndarray) : increasing sequence of normalized times
+        path (str) : output directory
+        chunksize (int, optional) : number of grid points per chunk
+        executor (optional) : None, an Executor from aldsim.parallel,
+            or 'thread' or 'process', used to evaluate each chunk
+        max_chunks (int, optional) : if provided, return after
+            evaluating at most this number of chunks
+        dtype (str, optional) : data type of the output files
+        **params : model parameters, either scalars or 1D arrays
+
+    Returns:
+        A SweepResult object with read-only memory-mapped arrays, which
+        are incomplete if the sweep has not finished
+
+    """
+    if model_cls not in _evaluators:
+        raise ValueError("No evaluator for model %s" % model_cls.__name__)
+    t = np.asarray(t, dtype=float)
+    dims = [name for name, value in params.items() if np.ndim(value) > 0]
+    if not dims:
+        raise ValueError("At least one parameter has to be an array")
+    coords = {name: np.asarray(params[name], dtype=float) for name in dims}
+    fixed = {name: None if value is None else float(value)
+        for name, value in params.items() if name not in dims}
+    grid_shape = tuple(coords[name].size for name in dims)
+    npoints = int(np.prod(grid_shape))
+    manifest = {
+        'model' : '%s.%s' % (model_cls.__module__, model_cls.__qualname__),
+        'dims' : dims,
+        'coords' : {name: value.tolist() for name, value in coords.items()},
+        'fixed' : fixed,
+        't' : t.tolist(),
+        'dtype' : np.dtype(dtype).str,
+        'chunksize' : chunksize,
+        'nchunks' : -(-npoints//chunksize),
+        'completed' : 0,
+    }
+    os.makedirs(path, exist_ok=True)
+    manifest_path = os.path.join(path, 'manifest.json')
+    shape = grid_shape + t.shape
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f)
+        completed = previous.pop('completed')
+        manifest.pop('completed')
+        if previous != manifest:
+            raise ValueError("%s holds a different sweep" % path)
+        manifest['completed'] = completed
+        outputs = [np.lib.format.open_memmap(os.path.join(path, name + '.npy'),
+            mode='r+') for name in ('coverage', 'precursor')]
+    else:
+        outputs = [np.lib.format.open_memmap(os.path.join(path, name + '.npy'),
+            mode='w+', dtype=dtype, shape=shape) for name in ('coverage', 'precursor')]
+        _write_manifest(manifest_path, manifest)
+    flat = [out.reshape(npoints, -1) for out in outputs]
+    last = manifest['nchunks']
+    if max_chunks is not None:
+        last = min(last, manifest['completed'] + max_chunks)
+    for n in range(manifest['completed'], last):
+        idx = np.arange(n*chunksize, min((n+1)*chunksize, npoints))
+        point = np.unravel_index(idx, grid_shape)
+        chunk = dict(fixed)
+        chunk.update({name: coords[name][i] for name, i in zip(dims, point)})
+        for out, value in zip(flat, evaluate(model_cls, t, executor, **chunk)):
+            out[idx[0]:idx[-1]+1] = np.broadcast_to(value, (idx.size,) + t.shape)
+        for out in outputs:
+            out.flush()
+        manifest['completed'] = n+1
+        _write_manifest(manifest_path, manifest)
+    del flat, outputs
+    return open_sweep(path)
+
+
+def open_sweep(path):
+    """Opens a sweep written by sweep_to_disk as a SweepResult"""
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    coords = {name: np.asarray(value) for name, value in manifest['coords'].items()}
+    coords['t'] = np.asarray(manifest['t'])
+    cov, prec = [np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+        for name in ('coverage', 'precursor')]
+    return SweepResult(tuple(manifest['dims']) + ('t',), coords, cov, prec)
+
+
+def _write_manifest(path, manifest):
+    """Replaces the manifest atomically, so that it is never left truncated"""
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+
+def _eval_plugflowmixed(t, Da):
+    Da = np.expand_dims(Da, -1)
+    return _pfm.calc_coverage(Da, t), _pfm.calc_precursor(Da, t)
+
+
+def _eval_wellmixed(t, Da):
+    Da = np.expand_dims(Da, -1)
+    y = _wm.calc_unreacted(Da, t)
+    return 1-y, 1/(1+Da*y)
+
+
+def _eval_plugflowspatial(t, Da):
+    Da = np.expand_dims(Da, -1)
+    return _pfs.calc_coverage(Da, t), _pfs.calc_precursor(Da, t)
+
+
+def _softsat_params(D1, D2, f1, f2, a):
+    if f2 is None:
+        f2 = 1-np.asarray(f1)
+    if D2 is None:
+        D2 = np.asarray(a)*D1
+    return np.broadcast_arrays(*[np.asarray(v, dtype=float)
+        for v in (D1, D2, f1, f2)])
+
+
+def _eval_softsat_wellstirred(t, D1, f1, D2=None, f2=None, a=None):
+    D1, D2, f1, f2 = [np.expand_dims(v, -1) for v in
+        _softsat_params(D1, D2, f1, f2, a)]
+    y1 = _ssws.calc_unreacted(D1, D2, f1, f2, t)
+    y2 = np.float_power(y1, D2/D1)
+    return f1*(1-y1) + f2*(1-y2), 1/(1+f1*D1*y1 + f2*D2*y2)
+
+
+def _eval_softsat_plugflow(t, D1, f1, D2=None, f2=None, a=None):
+    D1, D2, f1, f2 = _softsat_params(D1, D2, f1, f2, a)
+    _, y1 = _softsat.PlugFlowMixed(D1, D2, f1, f2)._integrate(t[-1], t)
+    D1, D2, f1, f2 = [np.expand_dims(v, -1) for v in (D1, D2, f1, f2)]
+    y2 = np.float_power(y1, D2/D1)
+    return f1*(1-y1) + f2*(1-y2), np.exp(-(f1*D1*y1 + f2*D2*y2))
+
+
+_evaluators = {
+    PlugFlowMixed : _eval_plugflowmixed,
+    WellMixed : _eval_wellmixed,
+    WellMixedSpatial : _eval_wellmixed,
+    PlugFlowSpatial : _eval_plugflowspatial,
+    _softsat.WellStirred : _eval_softsat_wellstirred,
+    _softsat.PlugFlowMixed : _eval_softsat_plugflow
+}
@@ -0,0 +1,160 @@
+#Copyright © 2024-2025, UChicago Argonne, LLC
+
+"""Precomputed coverage tables for the non-dimensional models"""
+
+import itertools
+import os
+
+import numpy as np
+
+from .sweeps import evaluate
+
+
+class CoverageTable:
+    """Coverage and precursor values tabulated on a regular grid
+
+    Queries are answered by multilinear interpolation, which preserves
+    the monotonicity of the tabulated values along each axis and never
+    leaves the range of the data. Axes listed in log_axes are
+    interpolated in logarithmic scale. Queries outside the grid are
+    clipped to its boundaries.
+
+    Args:
+        names (tuple) : names of the axes
+        axes (list) : grid values along each axis
+        values (ndarray) : array of shape axes_shape + (2,) with the
+            coverage and precursor values. It can be a memory map.
+        log_axes (tuple, optional) : axes interpolated in log scale
+        error (float, optional) : maximum interpolation error of the
+            coverage, estimated at the center of the grid cells
+
+    """
+
+    def __init__(self, names, axes, values, log_axes=(), error=None):
+        self.names = tuple(names)
+        self.axes = [np.asarray(ax, dtype=float) for ax in axes]
+        self.values = values
+        self.log_axes = tuple(log_axes)
+        self.error = error
+        self._grid = [np.log(ax) if name in self.log_axes else ax
+            for name, ax in zip(self.names, self.axes)]
+
+    def __call__(self, **params):
+        """Interpolates the table
+
+        Args:
+            **params : value of each axis. They are broadcast against
+                each other.
+
+        Returns:
+            A tuple of surface coverage, precursor arrays
+
+        """
+        coords = np.broadcast_arrays(*[np.asarray(params[name], dtype=float)
+            for name in self.names])
+        idx = []
+        weights = []
+        for name, g, x in zip(self.names, self._grid, coords):
+            if name in self.log_axes:
+                x = np.log(x)
+            x = np.clip(x, g[0], g[-1])
+            i = np.clip(np.searchsorted(g, x, side='right')-1, 0, len(g)-2)
+            idx.append(i)
+            weights.append((x-g[i])/(g[i+1]-g[i]))
+        out = 0
+        for corner in itertools.product((0, 1), repeat=len(idx)):
+            w = 1
+            for c, wi in zip(corner, weights):
+                w = w*(wi if c else 1-wi)
+            out = out + w[...,None]*self.values[tuple(i+c for i, c in zip(idx, corner))]
+        return out[...,0][()], out[...,1][()]
+
+    def save(self, path):
+        """Saves the table
+
+        The values are stored in path.npy, which can be loaded as a
+        memory map, and the axes in path.meta.npz
+
+        """
+        path = _stem(path)
+        np.save(path + '.npy', self.values)
+        meta = {'axis_%s' % name: ax for name, ax in zip(self.names, self.axes)}
+        np.savez(path + '.meta.npz', names=np.array(self.names),
+            log_axes=np.array(self.log_axes, dtype=str),
+            error=np.nan if self.error is None else self.error, **meta)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Loads a table saved with save
+
+        By default the values are memory mapped, so that a table can be
+        shared across processes without copying it.
+
+        """
+        path = _stem(path)
+        values = np.load(path + '.npy', mmap_mode=mmap_mode)
+        with np.load(path + '.meta.npz') as meta:
+            names = [str(name) for name in meta['names']]
+            axes = [meta['axis_%s' % name] for name in names]
+            log_axes = [str(name) for name in meta['log_axes']]
+            error = float(meta['error'])
+        return cls(names, axes, values, log_axes,
+            None if np.isnan(error) else error)
+
+
+def tabulate(model_cls, t, log_axes=('Da', 'D1', 'a'), estimate_error=True,
+        dtype=float, **axes):
+    """Tabulates a non-dimensional model
+
+    The model is evaluated on the grid given by the axes, with
+    the normalized time as the last axis. If estimate_error is True,
+    the model is also evaluated at the center of every cell to
+    provide a bound of the interpolation error.
+
+    Args:
+        model_cls : one of the non-dimensional model classes
+        t (ndarray) : increasing sequence of normalized times
+        log_axes (tuple, optional) : axes interpolated in log scale
+        estimate_error (bool, optional) : estimate the interpolation error
+        dtype (optional) : data type of the stored values
+        **axes : 1D arrays with the grid values of each model parameter.
+            For the soft saturating models, the axes can be D1, a=D2/D1
+            and f1, with f2 = 1-f1.
+
+    Returns:
+        A CoverageTable object
+
+    """
+    names = tuple(axes) + ('t',)
+    grid = [np.asarray(v, dtype=float) for v in axes.values()] + \
+        [np.asarray(t, dtype=float)]
+    log_axes = tuple(name for name in log_axes if name in names)
+    values = _tabulate(model_cls, names, grid).astype(dtype)
+    table = CoverageTable(names, grid, values, log_axes)
+    if estimate_error:
+        mid = [np.sqrt(g[1:]*g[:-1]) if name in log_axes else 0.5*(g[1:]+g[:-1])
+            for name, g in zip(names, grid)]
+        exact = _tabulate(model_cls, names, mid)[...,0]
+        approx, _ = table(**{name: m.reshape(_axis_shape(i, len(mid)))
+            for i, (name, m) in enumerate(zip(names, mid))})
+        table.error = float(np.max(np.abs(approx-exact)))
+    return table
+
+
+def _tabulate(model_cls, names, grid):
+    params = {name: g.reshape(_axis_shape(i, len(grid)-1))
+        for i, (name, g) in enumerate(zip(names[:-1], grid[:-1]))}
+    cov, prec = evaluate(model_cls, grid[-1], **params)
+    shape = tuple(len(g) for g in grid)
+    return np.stack(np.broadcast_arrays(cov, prec), axis=-1).reshape(shape + (2,))
+
+
+def _axis_shape(i, n):
+    shape = [1]*n
+    shape[i] = -1
+    return shape
+
+
+def _stem(path):
+    path = os.fspath(path)
+    return path[:-4] if path.endswith('.npy') else path
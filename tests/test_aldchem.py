@@ -1,3 +1,4 @@
+import numpy as np
 from aldsim.chem import Precursor, SurfaceKinetics, ALDsoft, ALDideal
 import pytest
 
@@ -21,6 +22,14 @@ def test_surfacekinupdate():
     k.site_area = 1e-18
     assert k.nsites == pytest.approx(1e18)
 
+def test_surfacekinfraction():
+    p = Precursor(mass=100)
+    k = SurfaceKinetics(p, 1e19, 0.5)
+    assert k.f == 0.5
+    k.f = 0.25
+    assert k.f == 0.25
+    assert k.nsites == pytest.approx(5e18)
+
 def test_aldideal():
     p = Precursor(mass=100)
     ald = ALDideal(p, 1e19, 0.001)
@@ -34,3 +43,25 @@ class TestSoftSaturating:
         assert k.site_area == pytest.approx(1e-19)
         k.site_area = 1e-18
         assert k.nsites == pytest.approx(1e18)
+
+
+def test_saturation_surface():
+    ald = ALDideal(Precursor(mass=100), 1e19, 1e-3)
+    T = np.array([400, 500, 600])[:,None]
+    p = np.array([1, 10])
+    cov = ald.saturation_surface(T, p, np.linspace(0, 1, 11))
+    assert cov.shape == (3, 2, 11)
+    x, y = ald.saturation_curve(500, 10)
+    assert ald.saturation_surface(500, 10, x) == pytest.approx(y)
+    cov = ald.saturation_surface(T, p, [0, 1], normalized=True)
+    assert cov[...,1] == pytest.approx(1-np.exp(-1))
+
+
+def test_soft_saturation_surface():
+    ald = ALDsoft(Precursor(mass=100), 1e19, 1e-2, 1e-3, 0.8)
+    x, y = ald.saturation_curve(500, 10)
+    cov = ald.saturation_surface(np.array([500, 600]), 10, x)
+    assert cov.shape == (2, len(x))
+    assert cov[0] == pytest.approx(y)
+    cov = ald.saturation_surface(500, 10, [1], normalized=True)
+    assert cov[0] == pytest.approx(0.8*(1-np.exp(-10))+0.2*(1-np.exp(-1)))
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from aldsim.aldutils import calc_vth, calc_sitearea_fromgpc, calc_sitearea_fromqcm
+from aldsim.chem import Precursor, ALDideal, ALDsoft
+
+
+def test_vth_scalar():
+    v = calc_vth(100, 500)
+    assert np.ndim(v) == 0
+    assert v == pytest.approx(325.2, rel=1e-3)
+
+
+def test_vth_broadcast():
+    M = np.array([18.01, 144.17])[:,None]
+    T = np.linspace(300, 600, 5)
+    v = calc_vth(M, T)
+    assert v.shape == (2, 5)
+    assert v[1,3] == pytest.approx(calc_vth(144.17, T[3]))
+
+
+def test_sitearea_broadcast():
+    gpc = np.array([0.5, 1.0, 2.0])
+    s = calc_sitearea_fromgpc(gpc, 101.96, 3.0, nmol=2)
+    assert s.shape == (3,)
+    assert s[0] == pytest.approx(2*s[1])
+    s = calc_sitearea_fromqcm(np.array([20, 40]), 101.96)
+    assert s[0] == pytest.approx(2*s[1])
+
+
+def test_t0_grid():
+    prec = Precursor(mass=np.array([100, 150])[:,None,None])
+    T = np.linspace(400, 600, 3)[:,None]
+    p = np.logspace(-1, 2, 4)
+    ald = ALDideal(prec, 1e19, 1e-3)
+    t0 = ald.t0(T, p)
+    assert t0.shape == (2, 3, 4)
+    ref = ALDideal(Precursor(mass=150), 1e19, 1e-3).t0(T[2,0], p[1])
+    assert t0[1,2,1] == pytest.approx(ref)
+    t1, t2 = ALDsoft(prec, 1e19, 1e-2, 1e-3, 0.8).t0(T, p)
+    assert t1.shape == t2.shape == (2, 3, 4)
+    assert t2 == pytest.approx(10*t1)
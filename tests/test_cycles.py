@@ -0,0 +1,44 @@
+import itertools
+import numpy as np
+import pytest
+
+from aldsim import Precursor, ALDideal, aldmodel
+from aldsim.chem import ALDProcess
+from aldsim.cycles import run_cycles, process_cycles
+
+
+@pytest.fixture
+def process():
+    chem1 = ALDideal(Precursor(mass=150.0), 1e19, 1e-3, dm=1.0)
+    chem2 = ALDideal(Precursor(name='H2O'), 1e19, 1e-4, dm=1.0)
+    return ALDProcess(chem1, chem2, 1e-3, 5e-3)
+
+
+def test_zerod_steady(process):
+    m1 = aldmodel(process.chem1, 'zeroD', p=0.1, T=500)
+    m2 = aldmodel(process.chem2, 'zeroD', p=0.1, T=500)
+    t1, t2 = m1.t0(), 0.5*m2.t0()
+    out = list(run_cycles(m1, m2, t1, t2, ncycles=50))
+    u1, u2 = np.exp(-1), np.exp(-0.5)
+    av = (1-u2)/(1-u1*u2)
+    assert len(out) == 50
+    assert out[-1].steady and not out[0].steady
+    assert out[-1].av == pytest.approx(av, rel=1e-10)
+    assert out[-1].growth == pytest.approx(av*(1-u1), rel=1e-10)
+    assert out[0].growth == pytest.approx(1-u1)
+    assert np.isnan(out[0].prec1)
+
+
+@pytest.mark.parametrize("name", ['wellstirred', 'fluidizedbed'])
+def test_process_cycles(process, name):
+    kwargs = dict(p=0.1*1e5/760, p0=1e2, T=500, S=1e1, flow=60)
+    process.n1 = 2*aldmodel(process.chem1, name, **kwargs).t0()
+    process.n2 = 0.5*aldmodel(process.chem2, name, **kwargs).t0()
+    gen = process_cycles(process, name, **kwargs)
+    out = list(itertools.islice(gen, 1000))
+    assert [c.n for c in out[:3]] == [1, 2, 3]
+    assert out[-1].steady
+    growth = np.array([c.growth for c in out])
+    assert np.all((growth > 0) & (growth <= 1))
+    assert out[-1].cov1 == pytest.approx(1 - out[-1].av + out[-1].growth)
+    assert 0 < out[0].prec1 < 1
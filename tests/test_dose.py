@@ -0,0 +1,60 @@
+from aldsim import Precursor, ALDideal, aldmodel
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def chem():
+    return ALDideal(Precursor(mass=150.0), 1e19, 1e-3, dm=1.0)
+
+
+@pytest.mark.parametrize("name", ['wellstirred', 'fluidizedbed'])
+def test_time_to_coverage(chem, name):
+    model = aldmodel(chem, name, p=0.1*1e5/760, p0=1e2, T=500, S=1e1, flow=60)
+    t, cov, x = model.run()
+    ts, xs = model.time_to_coverage(np.array([0.9, 0.99]))
+    assert ts[0] < ts[1]
+    assert ts == pytest.approx(t[np.searchsorted(cov, [0.9, 0.99])], rel=2e-2)
+
+
+@pytest.mark.parametrize("name", ['wellstirred', 'fluidizedbed'])
+def test_evaluate_recipes(chem, name):
+    p = np.array([5, 10, 20])
+    T = np.array([450, 500])[:,None]
+    model_cls = type(aldmodel(chem, name, p=10, p0=1e2, T=500, S=1e1, flow=60))
+    out = model_cls.evaluate_recipes(chem, p, 1e2, T, 1e1, 60, theta=0.95)
+    assert out.time.shape == (2, 3)
+    model = aldmodel(chem, name, p=20, p0=1e2, T=450, S=1e1, flow=60)
+    assert out.Da[0,2] == pytest.approx(model.Da())
+    assert out.t0[0,2] == pytest.approx(model.t0())
+    t, x = model.time_to_coverage(0.95)
+    assert out.time[0,2] == pytest.approx(t)
+    assert out.precursor[0,2] == pytest.approx(x)
+
+
+def test_evaluate_recipes_zerod(chem):
+    p = np.linspace(1, 10, 4)
+    out = aldmodel(chem, 'zeroD', p=1, T=500).evaluate_recipes(chem, p, 500)
+    model = aldmodel(chem, 'zeroD', p=p[1], T=500)
+    assert out.t0[1] == pytest.approx(model.t0())
+    assert model.calc_coverage(out.time[1]) == pytest.approx(0.99)
+    assert np.all(np.isnan(out.Da))
+
+
+def test_zerod_arguments(chem):
+    model = aldmodel(chem, 'zeroD', p=10, T=500)
+    assert model.p == 10
+    assert model.T == 500
+    assert model.t0() == pytest.approx(chem.t0(500, 10))
+    t, cov = model.saturation_curve()
+    assert t[-1] == pytest.approx(5*chem.t0(500, 10), rel=2e-2)
+
+
+@pytest.mark.parametrize("Da", [1e-2, 1e2, 1e4])
+def test_plugflow_large_Da(Da):
+    from aldsim.models.dose.batch import PlugFlowMixedND
+    m = PlugFlowMixedND(Da)
+    t, cov = m.saturation_curve()
+    assert np.all(np.isfinite(cov))
+    assert cov == pytest.approx(m.calc_coverage(t), abs=1e-9)
+    assert m.run().coverage == pytest.approx(cov)
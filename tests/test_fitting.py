@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from aldsim import Precursor, ALDideal, aldmodel
+from aldsim.fitting import (Exponential, DoubleExponential, Saturation,
+    fit_curves, calc_beta0, calc_dose)
+from aldsim.core.ideal.particle.batch import PlugFlowMixed, WellMixed
+from aldsim.core.ideal.particle.continuous import PlugFlowSpatial
+
+
+@pytest.fixture
+def chem():
+    return ALDideal(Precursor(mass=150.0), 1e19, 1e-3, dm=1.0)
+
+
+@pytest.mark.parametrize("model", [Exponential(), DoubleExponential(),
+    Saturation(WellMixed), Saturation(PlugFlowMixed), Saturation(PlugFlowSpatial)])
+def test_jacobian(model):
+    p = np.array([[2.0, 3.0, 0.5, 0.3], [1.0, 30.0, 2.0, 0.7]])[:,:len(model.names)]
+    t = np.linspace(0.01, 4, 50)[None,:]
+    f, J = model.jac(t, p)
+    for i in range(p.shape[1]):
+        h = 1e-6*p[:,i]
+        dp = np.zeros_like(p)
+        dp[:,i] = h
+        fd = (model.jac(t, p+dp)[0] - model.jac(t, p-dp)[0])/(2*h[:,None])
+        assert J[...,i] == pytest.approx(fd, rel=1e-5, abs=1e-7)
+
+
+@pytest.mark.parametrize("model_cls", [WellMixed, PlugFlowMixed, PlugFlowSpatial])
+def test_fit_saturation(model_cls):
+    Da = np.array([0.5, 3.0, 20.0])
+    t0 = np.array([2.0, 0.5, 1.0])
+    t = [np.linspace(0, 6*t0[k], 20+5*k) for k in range(3)]
+    y = [1.5*model_cls(Da[k]).calc_coverage(t=t[k]/t0[k]) for k in range(3)]
+    res = fit_curves(Saturation(model_cls), t, y)
+    assert np.all(res.converged)
+    assert res['Da'] == pytest.approx(Da, rel=1e-5)
+    assert res['t0'] == pytest.approx(t0, rel=1e-5)
+    assert res['A'] == pytest.approx(1.5, rel=1e-6)
+
+
+def test_fit_soft():
+    rng = np.random.default_rng(0)
+    k1, k2, f1 = 5.0, 0.4, 0.6
+    t = np.linspace(0, 15, 60)
+    y = f1*(1-np.exp(-k1*t)) + (1-f1)*(1-np.exp(-k2*t))
+    y = y + 1e-3*rng.standard_normal((8, t.size))
+    res = fit_curves(DoubleExponential(), np.tile(t, (8,1)), y)
+    assert np.all(res.converged)
+    assert res['k1'] == pytest.approx(k1, rel=2e-2)
+    assert res['k2'] == pytest.approx(k2, rel=2e-2)
+    assert res['f1'] == pytest.approx(f1, rel=2e-2)
+    assert np.all(np.abs(res['k1']-k1) < 5*res.stderr[:,1])
+
+
+def test_zerod_beta0(chem):
+    T, p = 500, 10.0
+    model = aldmodel(chem, 'zeroD', p=p, T=T)
+    t, cov = model.saturation_curve()
+    res = fit_curves(Exponential(), t, cov)
+    assert calc_beta0(chem, T, p, res['k']) == pytest.approx(chem.beta0, rel=1e-6)
+
+
+def test_dose_calibration(chem):
+    model = aldmodel(chem, 'wellstirred', p=0.1*1e5/760, p0=1e2, T=500, S=1e1, flow=60)
+    t, cov = model.saturation_curve()
+    res = fit_curves(Saturation(type(model)), t, cov)
+    beta0, site_area = calc_dose(model, res['Da'], res['t0'])
+    assert beta0 == pytest.approx(chem.beta0, rel=1e-5)
+    assert site_area == pytest.approx(chem.site_area, rel=1e-5)
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+
+def test_no_scipy_on_import():
+    code = ("import sys, aldsim; aldsim.Precursor(mass=150.0).vth(500); "
+        "from aldsim import aldmodel, sweep; "
+        "assert not any(m.startswith('scipy') for m in sys.modules)")
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_sweeps_not_imported():
+    code = "import sys, aldsim; assert 'aldsim.sweeps' not in sys.modules"
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_lazy_attributes():
+    import aldsim
+    from aldsim.aldmodel import aldmodel
+    from aldsim.sweeps import sweep
+    assert aldsim.aldmodel is aldmodel
+    assert aldsim.sweep is sweep
+    assert 'aldmodel' in dir(aldsim)
+
+
+def test_submodule_import_keeps_function():
+    code = ("import aldsim.aldmodel, aldsim.cycles, aldsim; "
+        "assert callable(aldsim.aldmodel) and not hasattr(aldsim.aldmodel, '__file__'); "
+        "from aldsim import aldmodel; from aldsim.aldmodel import aldmodel as f; "
+        "assert aldmodel is f")
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_softsat_plugflow_import():
+    code = "from aldsim.core.softsat.batch.plugflow import PlugFlowMixed"
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -0,0 +1,59 @@
+import json
+import numpy as np
+
+from aldsim.instrument import Recorder
+from aldsim.solvers import boundedNewton_solver
+from aldsim.core.ideal.particle.batch import WellMixed
+from aldsim.core.ideal.particle.continuous import WellMixedSpatial, PlugFlowSpatial
+from aldsim.core.softsat.batch import WellStirred
+
+
+def test_ode_counters():
+    WellMixedSpatial.cache.clear()
+    with Recorder() as rec:
+        t, cov, x = WellMixedSpatial(100, method='ode').run(tmax=3)
+    assert len(rec.calls) == 1
+    call = rec.calls[0]
+    assert call['solver'] == 'ode'
+    assert call['label'].endswith('WellMixedSpatial')
+    assert call['nfev'] >= call['steps'] > 0
+    assert call['wall_time'] > 0
+
+
+def test_newton_counters():
+    outer = Recorder()
+    with outer:
+        with Recorder() as rec:
+            WellMixed(10).calc_coverage(t=np.linspace(0, 3, 20))
+        boundedNewton_solver(lambda t: t-0.999, lambda t: 1)
+    summary = rec.summary()
+    key = 'bracketedNewton:aldsim.core.ideal.particle.batch.wellmixed.WellMixed'
+    assert list(summary) == [key]
+    counters = summary[key]
+    assert counters['calls'] == 1
+    assert counters['size'] == counters['converged'] == 20
+    assert 0 < counters['iterations'] < 20
+    assert counters['nfev'] >= 20
+    assert 'rejected' not in counters
+    assert len(outer.calls) == 2
+    assert outer.calls[1]['halvings'] > 0
+    assert json.loads(outer.to_json())['calls'][0] == rec.calls[0]
+
+
+def test_model_labels():
+    with Recorder() as rec:
+        WellStirred(10, 1, 0.6, 0.4).time_to_coverage(0.5)
+        PlugFlowSpatial(5).time_to_coverage(np.array([0.2, 0.9]))
+    labels = [call['label'] for call in rec.calls]
+    assert labels == ['aldsim.core.softsat.batch.wellstirred.WellStirred',
+        'aldsim.core.ideal.particle.continuous.plugflow.PlugFlowSpatial']
+    assert [call['converged'] for call in rec.calls] == [1, 2]
+
+
+def test_disabled():
+    rec = Recorder()
+    WellMixed(10).calc_coverage(t=1)
+    with rec:
+        pass
+    WellMixed(10).calc_coverage(t=1)
+    assert rec.calls == []
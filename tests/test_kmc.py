@@ -0,0 +1,30 @@
+from aldsim.chem import Precursor, ALDideal, ALDsoft
+from aldsim.kmc import LatticeKMC
+import numpy as np
+import pytest
+
+
+def test_meanfield_ideal():
+    chem = ALDideal(Precursor(mass=100), 1e19, 1e-3)
+    t, cov = LatticeKMC(chem, L=64, replicas=8, seed=1).saturation_curve(500, 10)
+    x, y = chem.saturation_curve(500, 10)
+    assert t == pytest.approx(x)
+    assert cov == pytest.approx(y, abs=1e-2)
+
+
+def test_meanfield_soft():
+    chem = ALDsoft(Precursor(mass=100), 1e19, 1e-2, 1e-3, 0.8)
+    t, cov = LatticeKMC(chem, L=64, replicas=8, seed=1).saturation_curve(500, 10)
+    assert cov == pytest.approx(chem.saturation_curve(500, 10)[1], abs=1e-2)
+
+
+def test_nearest_neighbour_blocking():
+    chem = ALDideal(Precursor(mass=100), 1e19, 1e-3)
+    t0 = chem.t0(500, 10)
+    out = LatticeKMC(chem, L=64, replicas=8, footprint='nn', seed=2).run(
+        500, 10, np.linspace(0, 30*t0, 301))
+    assert out.coverage.shape == (8, 301)
+    assert out.coverage[:,-1] + out.blocked[:,-1] == pytest.approx(1)
+    # jamming coverage of random sequential adsorption with
+    # nearest neighbour exclusion on the square lattice
+    assert np.mean(out.coverage[:,-1]) == pytest.approx(0.3641, abs=5e-3)
@@ -1,4 +1,7 @@
+import numpy as np
+import pytest
 from aldsim.core.ideal.particle.continuous import PlugFlowSpatial, WellMixedSpatial
+from aldsim.core.ideal.particle.batch import PlugFlowMixed, WellMixed
 
 class TestPlugFlowSpatial:
 
@@ -12,6 +15,17 @@ class TestPlugFlowSpatial:
         x,y,z = pfm.run()
         assert x.shape == y.shape
 
+    def test_singularity(self):
+        pfm = PlugFlowSpatial(10)
+        t = np.array([1-1e-7, 1, 1+1e-7])
+        assert pfm.calc_coverage(t=t) == pytest.approx(10/11)
+        _, c, x = pfm.run(tmax=1000, dt=1)
+        assert np.all(np.isfinite(c)) and np.all(np.isfinite(x))
+
+    def test_broadcast(self):
+        pfm = PlugFlowSpatial(np.array([1, 10, 100])[:,None])
+        assert pfm.calc_coverage(t=np.linspace(0, 2, 5)).shape == (3, 5)
+
 
 class TestWellMixedSpatial:
 
@@ -26,3 +40,41 @@ class TestWellMixedSpatial:
         assert x.shape == y.shape
 
 
+
+class TestWellMixedCoverage:
+
+    def test_array(self):
+        Da = np.array([0.1, 1, 10, 100])
+        tau = np.linspace(0, 5, 11)
+        cov = WellMixedSpatial(Da[:,None]).calc_coverage(t=tau)
+        assert cov.shape == (4, 11)
+        Da, tau = np.broadcast_arrays(Da[:,None], tau)
+        m = cov < 0.999
+        res = cov[m] - np.log(1-cov[m])/Da[m] - tau[m]
+        assert np.abs(res).max() < 1e-8
+
+    def test_scalar(self):
+        cov = WellMixedSpatial(10).calc_coverage(t=1)
+        assert cov - np.log(1-cov)/10 == pytest.approx(1)
+
+    def test_analytic(self):
+        for Da in [0.1, 1, 10, 100]:
+            t, cov, x = WellMixedSpatial(Da).run()
+            assert cov == pytest.approx(WellMixedSpatial(Da).calc_coverage(t=t), abs=1e-12)
+            _, cov_ode, x_ode = WellMixedSpatial(Da, method='ode').run()
+            assert cov == pytest.approx(cov_ode, abs=1e-2)
+            assert x == pytest.approx(x_ode, abs=5e-2)
+
+
+@pytest.mark.parametrize("model", [PlugFlowMixed, WellMixed, PlugFlowSpatial])
+def test_time_to_coverage(model):
+    theta = np.array([0.5, 0.95, 0.99, 0.999])
+    Da = np.array([0.1, 1, 10, 100])[:,None]
+    m = model(1)
+    t, x = m.time_to_coverage(theta, Da=Da)
+    assert t.shape == x.shape == (4, 4)
+    assert m.calc_coverage(t=t, Da=Da) == pytest.approx(np.broadcast_to(theta, t.shape))
+    tt, cov, xx = model(10).run(tmax=5, dt=1e-4)
+    i = np.searchsorted(cov, 0.95)
+    assert t[2,1] == pytest.approx(tt[i], abs=1e-3)
+    assert x[2,1] == pytest.approx(xx[i], abs=1e-3)
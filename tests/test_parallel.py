@@ -0,0 +1,53 @@
+from aldsim import Precursor, ALDideal, aldmodel
+from aldsim.parallel import Executor, map_chunks
+from aldsim.sweeps import evaluate, sweep
+from aldsim.core.ideal.particle.batch import WellMixed
+from aldsim.core.softsat.batch import WellStirred, PlugFlowMixed
+import pickle
+import numpy as np
+import pytest
+
+
+def _square_sum(x, y, offset=0):
+    return (x*x + offset)[:,None]*np.ones(3), y
+
+
+def test_map_chunks_order():
+    x = np.arange(10.0)[:,None]
+    y = np.arange(3.0)
+    with Executor('thread', workers=3) as ex:
+        a, b = map_chunks(_square_sum, dict(x=x, y=y), ex, args=())
+    assert a.shape == (10, 3, 3)
+    assert b.shape == (10, 3)
+    assert a[:,:,0] == pytest.approx(x*x + 0*y)
+    assert b == pytest.approx(np.broadcast_to(y, (10, 3)))
+
+
+@pytest.mark.parametrize("model_cls", [WellStirred, PlugFlowMixed])
+def test_softsat_process(model_cls):
+    m = model_cls(np.array([1, 10, 100])[:,None], np.array([0.5, 5]), 0.6, 0.4)
+    t, cov, x, _, _ = m.run(tmax=2, dt=0.1)
+    with Executor('process', workers=2) as ex:
+        tp, covp, xp, _, _ = m.run(tmax=2, dt=0.1, executor=ex)
+    assert covp.shape == cov.shape == (3, 2, t.shape[0])
+    assert covp == pytest.approx(cov, abs=1e-6)
+    assert xp == pytest.approx(x, abs=1e-6)
+
+
+def test_sweep_executor():
+    t = np.linspace(0, 5, 51)
+    r = sweep(WellStirred, t, D1=[1, 10], D2=[0.1, 1, 5], f1=0.8)
+    rt = sweep(WellStirred, t, executor='thread', D1=[1, 10], D2=[0.1, 1, 5], f1=0.8)
+    assert rt.shape == r.shape
+    assert rt.coverage == pytest.approx(r.coverage, abs=1e-6)
+    cov, x = evaluate(WellMixed, t, Executor('serial'), Da=np.ones((2, 3)))
+    assert cov.shape == (2, 3, 51)
+
+
+def test_pickle_dose_model():
+    chem = ALDideal(Precursor(mass=150.0), 1e19, 1e-3, dm=1.0)
+    model = aldmodel(chem, 'wellstirred', p=10, p0=1e2, T=500, S=1e1, flow=60)
+    clone = pickle.loads(pickle.dumps(model))
+    t, cov, x = model.run()
+    tc, covc, xc = clone.run()
+    assert covc == pytest.approx(cov)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from aldsim import Precursor, ALDideal, aldmodel
+from aldsim.core.ideal.particle.batch import PlugFlowMixed, WellMixed
+from aldsim.core.ideal.particle.continuous import PlugFlowSpatial
+from aldsim.core.ideal.particle.psd import LogNormal, Histogram, average
+
+
+def test_lognormal_moments():
+    r, w = LogNormal(0.5).nodes()
+    assert np.sum(w) == pytest.approx(1)
+    assert np.sum(w*r) == pytest.approx(1)
+    assert np.sum(w*r*r) == pytest.approx(np.exp(0.25))
+
+
+@pytest.mark.parametrize("model_cls", [PlugFlowMixed, WellMixed, PlugFlowSpatial])
+@pytest.mark.parametrize("dist", [LogNormal(1.0), Histogram([0.1, 1, 3], [5, 2])])
+def test_total_area(model_cls, dist):
+    """Only the total surface area matters under a common gas phase"""
+    t = np.linspace(0, 3, 13)
+    cov, prec = average(model_cls, t, 4.0, dist)
+    _, _, x = model_cls(4.0).run(tmax=3.25, dt=0.25)
+    assert cov == pytest.approx(model_cls(4.0).calc_coverage(t=t), abs=1e-7)
+    assert prec == pytest.approx(x, abs=1e-3)
+
+
+def test_shared_gas():
+    """Size classes coupled through the precursor fraction of a WellMixed reactor"""
+    from scipy.integrate import solve_ivp
+    r, w = LogNormal(1.0, n=16).nodes()
+    Da = 10
+    def f(t, y):
+        return -Da*y/(1+Da*np.sum(w*r*y))
+    t = np.array([0.5, 1, 2])
+    y = solve_ivp(f, [0, 2], np.ones(r.size), t_eval=t, rtol=1e-10, atol=1e-12).y
+    cov, prec = average(WellMixed, t, Da, LogNormal(1.0, n=16))
+    assert cov == pytest.approx(np.sum((w*r)[:,None]*(1-y), axis=0), abs=1e-6)
+    assert prec == pytest.approx(1/(1+Da*np.sum((w*r)[:,None]*y, axis=0)), abs=1e-6)
+    assert cov[1] == pytest.approx(0.8254, abs=1e-4)
+
+
+def test_histogram_lognormal():
+    """A finely binned log-normal histogram approaches the log-normal average"""
+    sigma = 0.4
+    edges = np.exp(np.linspace(-2.5, 2.5, 201))
+    centers = np.sqrt(edges[1:]*edges[:-1])
+    counts = np.exp(-np.log(centers)**2/(2*sigma**2))/centers*np.diff(edges)
+    t = np.array([0.3, 1, 2])[:,None]
+    Da = np.array([0.1, 10])
+    cov, prec = average(WellMixed, t, Da, LogNormal(sigma))
+    covh, prech = average(WellMixed, t, Da, Histogram(edges, counts, n=2))
+    assert cov.shape == (3, 2)
+    assert covh == pytest.approx(cov, abs=1e-4)
+    assert prech == pytest.approx(prec, abs=2e-4)
+
+
+def test_dose():
+    chem = ALDideal(Precursor(mass=150.0), 1e19, 1e-3, dm=1.0)
+    model = aldmodel(chem, 'fluidizedbed', p=0.1*1e5/760, p0=1e2, T=500, S=1e1, flow=60)
+    t = model.t0()*np.array([0.5, 1, 2])
+    cov, x = model.average_psd(t, LogNormal(0.3))
+    assert np.all(np.diff(cov) > 0)
+    assert cov == pytest.approx(model.calc_coverage(t), abs=1e-6)
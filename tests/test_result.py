@@ -0,0 +1,76 @@
+from aldsim import Precursor, ALDideal, aldmodel
+from aldsim.result import SimulationResult
+from aldsim.core.ideal.particle.batch import WellMixed, PlugFlowMixed
+from aldsim.core.ideal.particle.continuous import PlugFlowSpatial
+from aldsim.core.softsat.batch import WellStirred
+import numpy as np
+import pytest
+
+
+def test_unpack():
+    r = WellMixed(10).run()
+    t, cov, x = r
+    assert len(r) == 3
+    assert r.data.shape == (2, t.size)
+    assert r.data.flags['C_CONTIGUOUS']
+    assert np.shares_memory(cov, r.data)
+    assert r.coverage is not None and r['precursor'] == pytest.approx(x)
+    assert r[1] == pytest.approx(cov)
+    with pytest.raises(AttributeError):
+        r.cov1
+
+
+def test_softsat_channels():
+    r = WellStirred(np.array([1, 10]), 1, 0.6, 0.4).run()
+    assert r.names == ('coverage', 'precursor', 'coverage1', 'coverage2')
+    assert r.shape == (2, r.t.size)
+    assert r.coverage == pytest.approx(0.6*r.coverage1 + 0.4*r.coverage2)
+
+
+def test_dose_rescale():
+    chem = ALDideal(Precursor(mass=150.0), 1e19, 1e-3, dm=1.0)
+    model = aldmodel(chem, 'wellstirred', p=10, p0=1e2, T=500, S=1e1, flow=60)
+    r = model.run()
+    assert r.tscale == pytest.approx(model.t0())
+    assert r.time == pytest.approx(r.t*model.t0())
+    t, cov, x = r
+    assert t == pytest.approx(r.time)
+
+
+def test_float32_save_load(tmp_path):
+    r = WellMixed(10).run().rescale(2.0).astype(np.float32)
+    assert r.data.dtype == np.float32
+    path = str(tmp_path / 'run')
+    r.save(path)
+    s = SimulationResult.load(path)
+    assert isinstance(s.data, np.memmap)
+    assert s.names == r.names
+    assert s.time == pytest.approx(r.time)
+    assert s.coverage == pytest.approx(r.coverage)
+
+
+@pytest.mark.parametrize("make", [lambda: WellMixed(10), lambda: PlugFlowMixed(10),
+    lambda: PlugFlowSpatial(10), lambda: WellStirred(np.array([1, 10]), 1, 0.6, 0.4)])
+def test_run_dtype(make):
+    ref = make().run()
+    r = make().run(dtype=np.float32)
+    assert r.data.dtype == np.float32
+    assert r.data.shape == ref.data.shape
+    assert r.data == pytest.approx(ref.data, abs=1e-6)
+
+
+def test_dose_run_dtype():
+    chem = ALDideal(Precursor(mass=150.0), 1e19, 1e-3, dm=1.0)
+    model = aldmodel(chem, 'fluidizedbed', p=10, p0=1e2, T=500, S=1e1, flow=60)
+    r = model.run(dtype=np.float32)
+    assert r.data.dtype == np.float32
+    assert r.time is r.time
+    t, cov = model.saturation_curve()
+    assert t == pytest.approx(r.time)
+
+
+def test_save_pathlib(tmp_path):
+    r = WellMixed(10).run()
+    r.save(tmp_path / 'run.npy')
+    s = SimulationResult.load(tmp_path / 'run')
+    assert s.coverage == pytest.approx(r.coverage)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from aldsim.core.ideal.particle.continuous import (PlugFlowSpatial,
+    WellMixedSpatial, TanksInSeries, AxialDispersion, Sampled)
+
+# np.trapz was renamed np.trapezoid in NumPy 2.0
+trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
+
+@pytest.mark.parametrize("rtd", [TanksInSeries(2.5), AxialDispersion(5.0),
+    Sampled(np.linspace(0, 10, 101), np.exp(-np.linspace(0, 10, 101)))])
+def test_unit_mean(rtd):
+    s, w = rtd.nodes()
+    assert np.sum(w) == pytest.approx(1)
+    assert np.sum(w*s) == pytest.approx(1)
+
+
+def test_tanks_variance():
+    s, w = TanksInSeries(4).nodes()
+    assert np.sum(w*s*s) - 1 == pytest.approx(0.25)
+
+
+@pytest.mark.parametrize("model_cls", [PlugFlowSpatial, WellMixedSpatial])
+def test_plug_flow_limit(model_cls):
+    m = model_cls(5.0)
+    t = np.array([0.5, 1, 2])
+    cov = m.calc_coverage(t=t)
+    assert m.calc_coverage(t=t, rtd=AxialDispersion(1e6)) == pytest.approx(cov, abs=1e-3)
+    assert m.calc_coverage(t=t, rtd=TanksInSeries(1e5)) == pytest.approx(cov, abs=1e-3)
+
+
+def test_single_tank():
+    """Exponential RTD: compare with a direct quadrature"""
+    Da = np.array([0.5, 20])[:,None]
+    tm = np.array([0.5, 2])
+    m = PlugFlowSpatial(1.0)
+    cov = m.calc_coverage(Da=Da, t=tm, rtd=TanksInSeries(1))
+    assert cov.shape == (2, 2)
+    t = np.linspace(0, 60, 600001)
+    for i in range(2):
+        for j in range(2):
+            f = np.exp(-t/tm[j])/tm[j]*m.calc_coverage(Da=Da[i,0], t=t)
+            assert cov[i,j] == pytest.approx(trapezoid(f, t), abs=1e-6)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from aldsim.sampling import adaptive_sampling
+from aldsim.core.ideal.particle.continuous import PlugFlowSpatial
+from aldsim.core.ideal.particle.batch import PlugFlowMixed, WellMixed
+from aldsim.core.softsat.batch import WellStirred
+
+
+def test_adaptive_error():
+    x, y = adaptive_sampling(np.tanh, -5, 5, tol=1e-4)
+    xf = np.linspace(-5, 5, 10001)
+    assert np.max(np.abs(np.interp(xf, x, y) - np.tanh(xf))) < 2e-4
+    assert len(x) < 1000
+    assert np.all(np.diff(x) > 0)
+
+
+@pytest.mark.parametrize("model", [PlugFlowMixed(10), WellMixed(10),
+    WellMixed(10, method='ode'), PlugFlowSpatial(10)])
+def test_run_tol(model):
+    t, cov, x = model.run(tmax=5, tol=1e-4)
+    tf, covf, xf = model.run(tmax=5, dt=0.0005)
+    assert len(t) < len(tf)/10
+    assert t[0] == 0 and t[-1] == 5
+    assert np.max(np.abs(np.interp(tf, t, cov) - covf)) < 5e-4
+    assert np.max(np.abs(np.interp(tf, t, x) - xf)) < 5e-4
+
+
+def test_implicit_tol():
+    m = WellMixed(10)
+    tau, theta = m.saturation_curve_implicit(tol=1e-4)
+    assert len(tau) < 1000
+    assert np.allclose(m.calc_coverage(t=tau), theta, atol=1e-8)
+
+
+def test_softsat_tol():
+    m = WellStirred(100, 1, 0.5, 0.5)
+    t, cov, x, cov1, cov2 = m.run(tmax=5, tol=1e-4)
+    assert len(t) < 500
+    assert np.allclose(cov, m.calc_coverage(t), atol=1e-3)
+    with pytest.raises(ValueError):
+        WellStirred(np.array([10, 100]), 1, 0.5, 0.5).run(tol=1e-4)
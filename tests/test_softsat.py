@@ -0,0 +1,100 @@
+from aldsim.core.softsat.batch import WellStirred, PlugFlowMixed
+import numpy as np
+import pytest
+
+
+class TestWellStirred:
+
+    def test_run(self):
+        t, cov, x, cov1, cov2 = WellStirred(10, 1, 0.8, 0.2).run()
+        assert t.shape == cov.shape == x.shape
+
+    def test_cache(self):
+        m = WellStirred(3, 0.3, 0.5, 0.5)
+        WellStirred.cache.clear()
+        t, cov, _, _, _ = m.run(tmax=5, dt=0.5)
+        t2, cov2, _, _, _ = m.run(tmax=2, dt=0.25)
+        assert WellStirred.cache.hits == 1
+        assert cov2[::2] == pytest.approx(cov[:4])
+
+    def test_implicit(self):
+        D1, D2, f1, f2 = 20, 0.2, 0.3, 0.7
+        t, cov, x, cov1, cov2 = WellStirred(D1, D2, f1, f2).run()
+        m = cov1 < 0.999
+        tau = -np.log(1-cov1[m])/D1 + f1*cov1[m] + f2*cov2[m]
+        assert tau == pytest.approx(t[m], abs=1e-2)
+
+    def test_precursor(self):
+        D1, D2, f1, f2 = 20, 0.5, 0.3, 0.7
+        m = WellStirred(D1, D2, f1, f2)
+        t, cov, x, cov1, cov2 = m.run()
+        assert x[0] == pytest.approx(1/(1+f1*D1+f2*D2))
+        assert x == pytest.approx(1/(1+f1*D1*(1-cov1)+f2*D2*(1-cov2)))
+        t2, x2 = m.time_to_coverage(np.array([0.5, 0.8]))
+        assert np.interp(t2, t, x) == pytest.approx(x2, abs=1e-4)
+
+    def test_batch(self):
+        D1 = np.array([1, 10, 100])
+        m = WellStirred(D1[:,None], np.array([0.5, 5]), 0.6, 0.4)
+        t, cov, x, _, _ = m.run()
+        assert cov.shape == (3, 2, t.shape[0])
+        _, cov_s, x_s, _, _ = WellStirred(10, 5, 0.6, 0.4).run()
+        assert cov[1,1] == pytest.approx(cov_s, abs=5e-3)
+        assert x[1,1] == pytest.approx(x_s, abs=5e-3)
+
+    def test_coverage(self):
+        m = WellStirred(np.array([1, 10, 100]), 5, 0.6, 0.4)
+        t = np.linspace(0, 5, 11)
+        cov = m.calc_coverage(t[:,None])
+        assert cov.shape == (11, 3)
+        _, cov_s, _, _, _ = WellStirred(10, 5, 0.6, 0.4).run(tmax=5.5, dt=0.5)
+        assert cov[:,1] == pytest.approx(cov_s, abs=5e-3)
+
+
+@pytest.mark.parametrize("model_cls", [WellStirred, PlugFlowMixed])
+def test_batch_grouping(model_cls):
+    D1 = np.array([0.5, 10, 300])
+    _, cov, _, _, _ = model_cls(D1, 2, 0.6, 0.4).run(tmax=3)
+    for i in range(3):
+        _, cov_i, _, _, _ = model_cls(D1[i:i+1], 2, 0.6, 0.4).run(tmax=3)
+        assert cov_i[0] == pytest.approx(cov[i], abs=1e-6)
+
+
+@pytest.mark.parametrize("model_cls", [WellStirred, PlugFlowMixed])
+def test_small_ratio(model_cls):
+    D1 = np.array([10, 300])
+    out = model_cls(D1, 1e-4*D1, 0.6, 0.4).run(tmax=20)
+    for y in out:
+        assert np.all(np.isfinite(y))
+    assert np.all((out.coverage >= 0) & (out.coverage <= 1))
+
+
+class TestPlugFlowMixed:
+
+    def test_batch(self):
+        m = PlugFlowMixed(np.array([1, 10, 100]), 1, 0.6, 0.4)
+        t, cov = m.saturation_curve()
+        assert cov.shape == (3, t.shape[0])
+        _, cov_s = PlugFlowMixed(10, 1, 0.6, 0.4).saturation_curve()
+        assert cov[1] == pytest.approx(cov_s, abs=5e-3)
+
+    def test_coverage(self):
+        m = PlugFlowMixed(10, 1, 0.6, 0.4)
+        t, cov, x, _, _ = m.run()
+        assert m.calc_coverage(t) == pytest.approx(cov, abs=5e-3)
+        assert m.calc_coverage(0) == 0
+
+    def test_ideal(self):
+        from aldsim.core.ideal.particle.batch.plugflow import calc_coverage
+        t = np.linspace(0, 3, 7)
+        cov = PlugFlowMixed(2, 2, 1, 0).calc_coverage(t)
+        assert cov == pytest.approx(calc_coverage(2, t))
+
+
+@pytest.mark.parametrize("model", [WellStirred, PlugFlowMixed])
+def test_time_to_coverage(model):
+    theta = np.array([0.5, 0.95, 0.99])
+    m = model(np.array([1, 10, 100])[:,None], 0.5, 0.6, 0.4)
+    t, x = m.time_to_coverage(theta)
+    assert t.shape == (3, 3)
+    assert m.calc_coverage(t) == pytest.approx(np.broadcast_to(theta, t.shape))
@@ -0,0 +1,33 @@
+from aldsim.solvers import bracketedNewton_solver, SolutionCache
+import numpy as np
+import pytest
+
+
+def test_bracketednewton_scalar():
+    x = bracketedNewton_solver(lambda x: x**2-2, lambda x: 2*x, 0, 2)
+    assert np.ndim(x) == 0
+    assert x == pytest.approx(np.sqrt(2))
+
+def test_bracketednewton_broadcast():
+    c = np.array([0.5, 2, 3])
+    x, conv = bracketedNewton_solver(lambda x, c: x**3-c, lambda x, c: 3*x**2,
+        0, 4, args=(c[:,None],), x0=np.ones((1,2)), full_output=True)
+    assert x.shape == (3,2)
+    assert np.all(conv)
+    assert x[:,0] == pytest.approx(np.cbrt(c))
+
+def test_solutioncache():
+    cache = SolutionCache(maxsize=2)
+    calls = []
+    solve = lambda tmax: calls.append(tmax) or tmax
+    cache.get((1,), 5, solve)
+    cache.get((1,), 3, solve)
+    assert cache.hits == 1 and cache.misses == 1
+    cache.get((1,), 10, solve)
+    assert calls == [5, 10]
+    cache.get((2,), 5, solve)
+    cache.get((3,), 5, solve)
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    cache.maxsize = 1
+    assert cache.info()['size'] == 1
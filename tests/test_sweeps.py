@@ -0,0 +1,61 @@
+from aldsim import sweep
+from aldsim.sweeps import evaluate, sweep_to_disk, open_sweep
+from aldsim.core.ideal.particle.batch import PlugFlowMixed, WellMixed
+from aldsim.core.ideal.particle.continuous import PlugFlowSpatial
+from aldsim.core.softsat.batch import WellStirred
+from aldsim.core.softsat.batch import PlugFlowMixed as SoftPlugFlowMixed
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("model", [PlugFlowMixed, WellMixed, PlugFlowSpatial])
+def test_sweep_ideal(model):
+    t = np.arange(0, 5, 0.01)
+    r = sweep(model, t, Da=np.array([0.1, 1, 10]))
+    assert r.dims == ('Da', 't')
+    assert r.shape == (3, 500)
+    _, cov, x = model(10).run()
+    assert r.coverage[2] == pytest.approx(cov)
+    assert r['precursor'][2] == pytest.approx(x)
+
+def test_sweep_softsat():
+    t = np.arange(0, 5, 0.01)
+    r = sweep(WellStirred, t, D1=[1, 10], D2=[0.1, 1, 5], f1=0.8)
+    assert r.dims == ('D1', 'D2', 't')
+    assert r.shape == (2, 3, 500)
+    _, cov, x, _, _ = WellStirred(10, 5, 0.8, 0.2).run()
+    assert r.coverage[1,2] == pytest.approx(cov, abs=5e-3)
+    assert r.precursor[1,2] == pytest.approx(x, abs=5e-3)
+
+@pytest.mark.parametrize("model", [WellStirred, SoftPlugFlowMixed])
+def test_evaluate_softsat(model):
+    D1 = np.array([0.5, 10, 300])[:,None]
+    D2 = np.array([0.01, 2])
+    t, cov, x, _, _ = model(D1, D2, 0.6, 0.4).run()
+    cov_e, x_e = evaluate(model, t, D1=D1, D2=D2, f1=0.6)
+    assert cov_e.shape == cov.shape
+    assert cov_e == pytest.approx(cov, abs=1e-6)
+    assert x_e == pytest.approx(x, rel=1e-5)
+
+def test_evaluate_broadcast():
+    cov, x = evaluate(WellMixed, np.linspace(0, 2, 5), Da=np.ones((2,3)))
+    assert cov.shape == (2, 3, 5)
+
+
+def test_sweep_to_disk(tmp_path):
+    t = np.linspace(0, 5, 21)
+    params = dict(D1=[1, 10, 100], D2=[0.1, 1, 5], f1=0.8)
+    ref = sweep(WellStirred, t, **params)
+    path = str(tmp_path / 'sweep')
+    r = sweep_to_disk(WellStirred, t, path, chunksize=4, max_chunks=1, **params)
+    assert r.shape == ref.shape
+    assert r.coverage.reshape(9, -1)[:4] == pytest.approx(
+        ref.coverage.reshape(9, -1)[:4], abs=5e-3)
+    r = sweep_to_disk(WellStirred, t, path, chunksize=4, **params)
+    assert r.dims == ref.dims
+    assert r.coverage == pytest.approx(ref.coverage, abs=5e-3)
+    assert r.precursor == pytest.approx(ref.precursor, abs=5e-3)
+    r = open_sweep(path)
+    assert r['D2'] == pytest.approx(params['D2'])
+    with pytest.raises(ValueError):
+        sweep_to_disk(WellStirred, t, path, chunksize=4, D1=[1, 10], D2=1, f1=0.8)
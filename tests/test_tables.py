@@ -0,0 +1,27 @@
+from aldsim.tables import tabulate, CoverageTable
+from aldsim.core.ideal.particle.batch import WellMixed
+from aldsim.core.ideal.particle.batch.wellmixed import calc_coverage
+from aldsim.core.softsat.batch import WellStirred
+import numpy as np
+import pytest
+
+
+def test_wellmixed_table(tmp_path):
+    table = tabulate(WellMixed, np.linspace(0, 5, 101), Da=np.logspace(-1, 2, 31))
+    Da = np.array([0.3, 3, 30])
+    t = np.array([0.25, 1.1, 4.2])
+    cov, x = table(Da=Da, t=t)
+    assert np.abs(cov-calc_coverage(Da, t)).max() <= table.error
+    table.save(tmp_path / 'wellmixed')
+    loaded = CoverageTable.load(tmp_path / 'wellmixed.npy')
+    assert isinstance(loaded.values, np.memmap)
+    assert loaded.error == table.error
+    assert loaded(Da=Da, t=t)[0] == pytest.approx(cov)
+
+def test_softsat_table():
+    table = tabulate(WellStirred, np.linspace(0, 5, 26), D1=np.logspace(0, 1, 5),
+        a=np.array([0.1, 0.5, 1]), f1=np.array([0.4, 0.8]))
+    assert table.names == ('D1', 'a', 'f1', 't')
+    assert table.values.shape == (5, 3, 2, 26, 2)
+    cov, x = table(D1=2, a=0.3, f1=0.5, t=np.linspace(0, 5, 11))
+    assert np.all(np.diff(cov) >= 0)
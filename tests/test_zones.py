@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from aldsim.core.ideal.particle.continuous import (PlugFlowSpatial,
+    WellMixedSpatial, Zone, Purge, ZonePipeline)
+
+
+@pytest.mark.parametrize("model_cls", [PlugFlowSpatial, WellMixedSpatial])
+def test_single_zone(model_cls):
+    Da = np.array([0.1, 1, 10])[:,None]
+    t = np.linspace(0.1, 3, 7)
+    res = ZonePipeline([Zone(model_cls, Da, t)]).run()
+    assert res.reacted.shape == (1, 3, 7)
+    assert res.coverage[-1] == pytest.approx(model_cls(1).calc_coverage(Da=Da, t=t))
+
+
+def test_split_zone():
+    """A well mixed zone split in two is equivalent to the batch WellMixed model"""
+    Da, t1, t2 = 5.0, 0.4, 0.7
+    res = ZonePipeline([Zone(WellMixedSpatial, Da, t1), Purge(),
+        Zone(WellMixedSpatial, Da, t2)]).run()
+    assert res.coverage[-1] == pytest.approx(WellMixedSpatial(Da).calc_coverage(t=t1+t2))
+
+
+def test_cycles():
+    Da = np.logspace(-1, 2, 5)
+    line = ZonePipeline.cycles(Zone(PlugFlowSpatial, Da, 2),
+        Zone(WellMixedSpatial, 10, 0.5, precursor=2), ncycles=3)
+    res = line.run(av=np.array([1, 0.5])[:,None])
+    assert res.av.shape == (13, 2, 5)
+    assert np.all(np.isnan(res.precursor[1::2]))
+    assert np.all((res.av >= 0) & (res.av <= 1))
+    assert np.all(res.growth > 0) and np.all(res.growth <= 3)
+    # second precursor zones can only increase the available fraction
+    assert np.all(res.av[3::4] >= res.av[2::4])